@@ -1,39 +1,79 @@
+import asyncio
 import logging
-import os
+import queue
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
-from dotenv import load_dotenv
 from fastapi import FastAPI, Request
 from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 
+from src.config import GITLAB_URL, GITLAB_USER, HOST, PORT
 from src.gitlab_api import (
+    close_gitlab_client,
     extract_noteable_iid,
+    get_gitlab_client,
     is_self_authored_note,
     post_gitlab_note,
 )
 from src.admin_api import router as admin_router
 from src.pipelines.commands.oc_review import ReviewCommand
-from src.pipelines.registry import contains_user_mention, detect_command
-
-load_dotenv()
+from src.pipelines.registry import (
+    contains_user_mention,
+    detect_command,
+    get_pipeline_for_command,
+)
+from src.webhook_events import WebhookEvent, decode_webhook_event, decode_webhook_payload
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
+
+_pipeline_tasks: set[asyncio.Task] = set()
+
+# Only note events can trigger a pipeline; GitLab names confidential ones separately.
+NOTE_HOOK_EVENTS = frozenset({"Note Hook", "Confidential Note Hook"})
+
+
+def _start_log_listener() -> QueueListener:
+    """Hand the root handlers to a listener thread so log writes skip the event loop."""
+    root = logging.getLogger()
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+    root.handlers = [QueueHandler(log_queue)]
+    listener.start()
+    return listener
+
+
+def _stop_log_listener(listener: QueueListener) -> None:
+    listener.stop()
+    logging.getLogger().handlers = list(listener.handlers)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    log_listener = _start_log_listener()
+    get_gitlab_client()
+    try:
+        yield
+    finally:
+        for task in _pipeline_tasks:
+            task.cancel()
+        await asyncio.gather(*_pipeline_tasks, return_exceptions=True)
+        await close_gitlab_client()
+        _stop_log_listener(log_listener)
+
+
 app = FastAPI(
     title="GitLab AI Code Reviewer",
     description="Webhook service for AI-powered code review on GitLab MRs",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
-GITLAB_URL = os.getenv("GITLAB_URL", "https://gitlab.example.com")
-GITLAB_PAT = os.getenv("GITLAB_PAT", "")
-GITLAB_USER = os.getenv("GITLAB_USER", "").strip().lstrip("@")
-HOST = os.getenv("HOST", "0.0.0.0")
-PORT = int(os.getenv("PORT", "8585"))
 BASE_DIR = Path(__file__).resolve().parent
 UI_DIST_DIR = BASE_DIR / "ui" / "dist"
 UI_ASSETS_DIR = UI_DIST_DIR / "assets"
@@ -51,21 +91,20 @@ def _preview_text(value: str, *, limit: int = 160) -> str:
     return f"{compact[: limit - 3]}..."
 
 
-def _webhook_log_fields(request: Request, payload: dict) -> dict[str, object]:
-    attrs = payload.get("object_attributes", {})
-    project = payload.get("project", {})
-    user = payload.get("user", {})
+def _webhook_log_fields(request: Request, event: WebhookEvent) -> dict[str, object]:
+    attrs = event.object_attributes
+    project = event.project
     return {
         "path": request.url.path,
         "gitlab_event": request.headers.get("x-gitlab-event", ""),
         "has_gitlab_token": bool(request.headers.get("x-gitlab-token")),
-        "object_kind": payload.get("object_kind"),
-        "noteable_type": attrs.get("noteable_type"),
-        "project_id": project.get("id"),
-        "project_path": project.get("path_with_namespace") or project.get("web_url"),
-        "user": user.get("username") or user.get("name"),
-        "note_id": attrs.get("id"),
-        "note_preview": _preview_text(str(attrs.get("note") or "")),
+        "object_kind": event.object_kind,
+        "noteable_type": attrs.noteable_type,
+        "project_id": project.id,
+        "project_path": project.path_with_namespace or project.web_url,
+        "user": event.user.username or event.user.name,
+        "note_id": attrs.id,
+        "note_preview": _preview_text(attrs.note or ""),
     }
 
 
@@ -83,24 +122,28 @@ async def _run_detected_command(
     command,
     trigger_text: str | None = None,
     display_trigger: str | None = None,
+    pipeline=None,
 ) -> JSONResponse:
     from src.pipelines.base import PipelineContext
-    import asyncio
 
-    context = PipelineContext(webhook_payload=payload)
     if trigger_text:
-        context.command = command_name
-        context.metadata["noteable_type"] = payload.get("object_attributes", {}).get(
-            "noteable_type"
-        )
-        context.metadata["note_body"] = payload.get("object_attributes", {}).get(
-            "note", ""
-        )
-        context.metadata["trigger_pattern"] = trigger_text
+        attributes = payload.get("object_attributes", {})
+        metadata = {
+            "noteable_type": attributes.get("noteable_type"),
+            "note_body": attributes.get("note", ""),
+            "trigger_pattern": trigger_text,
+        }
         if display_trigger:
-            context.metadata["display_trigger"] = display_trigger
+            metadata["display_trigger"] = display_trigger
+        # Passing the metadata up front lets the context resolve the noteable
+        # iid with the type that is already known.
+        context = PipelineContext(
+            webhook_payload=payload, command=command_name, metadata=metadata
+        )
+    else:
+        context = PipelineContext(webhook_payload=payload)
 
-    pipeline = command.get_pipeline()
+    pipeline = pipeline or command.get_pipeline()
     logger.info(
         "Dispatching pipeline command=%s trigger=%s display_trigger=%s pipeline=%s",
         command_name,
@@ -108,14 +151,29 @@ async def _run_detected_command(
         display_trigger or "",
         pipeline.name,
     )
-    loop = asyncio.get_running_loop()
-    result = await loop.run_in_executor(None, pipeline.execute, context)
+    task = asyncio.create_task(
+        _execute_pipeline(pipeline, context, command_name),
+        name=f"pipeline:{command_name}",
+    )
+    _pipeline_tasks.add(task)
+    task.add_done_callback(_pipeline_tasks.discard)
+    return JSONResponse({"status": "accepted", "command": command_name})
+
+
+async def _execute_pipeline(pipeline, context, command_name: str) -> None:
+    try:
+        result = await pipeline.execute(context)
+    except Exception:
+        logger.exception(
+            "Pipeline crashed command=%s pipeline=%s", command_name, pipeline.name
+        )
+        return
 
     if result.success:
         logger.info(
             "Pipeline completed command=%s pipeline=%s", command_name, pipeline.name
         )
-        return JSONResponse({"status": "completed", "command": command_name})
+        return
 
     logger.error(
         "Pipeline failed command=%s pipeline=%s error=%s",
@@ -123,14 +181,13 @@ async def _run_detected_command(
         pipeline.name,
         result.error,
     )
-    return JSONResponse({"status": "error", "error": str(result.error)}, status_code=500)
 
 
-def _post_mention_reply(payload: dict) -> JSONResponse:
+async def _post_mention_reply(payload: dict) -> JSONResponse:
     project_id = payload.get("project", {}).get("id")
     noteable_type = payload.get("object_attributes", {}).get("noteable_type")
-    noteable_iid = extract_noteable_iid(payload)
-    note_response = post_gitlab_note(
+    noteable_iid = extract_noteable_iid(payload, noteable_type)
+    note_response = await post_gitlab_note(
         project_id,
         noteable_type,
         noteable_iid,
@@ -155,6 +212,7 @@ async def _run_mention_review(payload: dict) -> JSONResponse:
         review_command,
         trigger_text=mention,
         display_trigger=review_command.trigger_pattern,
+        pipeline=get_pipeline_for_command(review_command.name),
     )
 
 
@@ -236,7 +294,7 @@ async def health_check():
 
 @app.post("/webhook")
 async def gitlab_webhook(request: Request):
-    """Receive GitLab webhook events - async, then triggers sync pipeline"""
+    """Receive GitLab webhook events and schedule the matching pipeline"""
     try:
         logger.info(
             "GitLab webhook request arrived path=%s gitlab_event=%s has_gitlab_token=%s content_type=%s",
@@ -245,11 +303,17 @@ async def gitlab_webhook(request: Request):
             bool(request.headers.get("x-gitlab-token")),
             request.headers.get("content-type", ""),
         )
-        payload = await request.json()
-        log_fields = _webhook_log_fields(request, payload)
+        gitlab_event = request.headers.get("x-gitlab-event")
+        if gitlab_event and gitlab_event not in NOTE_HOOK_EVENTS:
+            logger.info("Ignoring webhook without reading body: gitlab_event=%s", gitlab_event)
+            return JSONResponse({"status": "ignored"})
+
+        body = await request.body()
+        event = decode_webhook_event(body)
+        log_fields = _webhook_log_fields(request, event)
         logger.info("GitLab webhook received: %s", log_fields)
 
-        event_type = payload.get("object_kind")
+        event_type = event.object_kind
         if event_type != "note":
             logger.info(
                 "Ignoring webhook: unsupported object_kind=%s gitlab_event=%s project_id=%s",
@@ -259,8 +323,8 @@ async def gitlab_webhook(request: Request):
             )
             return JSONResponse({"status": "ignored"})
 
-        note = payload.get("object_attributes", {}).get("note", "")
-        if is_self_authored_note(payload, GITLAB_USER):
+        note = event.object_attributes.note or ""
+        if is_self_authored_note(event.user.username, GITLAB_USER):
             logger.info(
                 "Ignoring webhook note: self-authored user=%s project_id=%s noteable_type=%s note_preview=%r",
                 GITLAB_USER,
@@ -280,10 +344,15 @@ async def gitlab_webhook(request: Request):
                 log_fields["noteable_type"],
                 log_fields["note_preview"],
             )
-            return await _run_detected_command(payload, command.name, command)
+            return await _run_detected_command(
+                decode_webhook_payload(body),
+                command.name,
+                command,
+                pipeline=get_pipeline_for_command(command.name),
+            )
 
         if contains_user_mention(note, GITLAB_USER):
-            noteable_type = payload.get("object_attributes", {}).get("noteable_type")
+            noteable_type = event.object_attributes.noteable_type
             logger.info(
                 "Detected bot mention user=@%s project_id=%s noteable_type=%s note_preview=%r",
                 GITLAB_USER,
@@ -291,9 +360,10 @@ async def gitlab_webhook(request: Request):
                 noteable_type,
                 log_fields["note_preview"],
             )
+            payload = decode_webhook_payload(body)
             if noteable_type == "MergeRequest":
                 return await _run_mention_review(payload)
-            return _post_mention_reply(payload)
+            return await _post_mention_reply(payload)
 
         logger.info(
             "Ignoring webhook note: no supported trigger project_id=%s noteable_type=%s configured_user=@%s note_preview=%r",
@@ -312,5 +382,11 @@ async def gitlab_webhook(request: Request):
 if __name__ == "__main__":
     import uvicorn
 
-    logger.info(f"Starting server on {HOST}:{PORT}")
-    uvicorn.run(app, host=HOST, port=PORT)
+    logger.info("Starting server on %s:%s", HOST, PORT)
+    uvicorn.run(
+        app,
+        host=HOST,
+        port=PORT,
+        log_level="warning",
+        access_log=False,
+    )
@@ -1,8 +1,9 @@
-from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any, List
+from typing import Optional
 
+import msgspec
 
-class ProjectInfo(BaseModel):
+
+class ProjectInfo(msgspec.Struct, kw_only=True, omit_defaults=True):
     id: int
     name: str
     description: Optional[str] = None
@@ -10,7 +11,7 @@ class ProjectInfo(BaseModel):
     path_with_namespace: str
 
 
-class ObjectAttributes(BaseModel):
+class ObjectAttributes(msgspec.Struct, kw_only=True, omit_defaults=True):
     id: int
     iid: Optional[int] = None
     action: Optional[str] = None
@@ -22,7 +23,7 @@ class ObjectAttributes(BaseModel):
     url: Optional[str] = None
 
 
-class MergeRequest(BaseModel):
+class MergeRequest(msgspec.Struct, kw_only=True, omit_defaults=True):
     id: int
     iid: int
     title: str
@@ -33,15 +34,16 @@ class MergeRequest(BaseModel):
     author_id: int
 
 
-class User(BaseModel):
+class User(msgspec.Struct, omit_defaults=True):
     id: int
     name: str
     username: str
     email: str
 
 
-class GitLabWebhook(BaseModel):
-    object_kind: str = Field(..., description="Type of webhook event")
+class GitLabWebhook(msgspec.Struct, omit_defaults=True):
+    # Type of webhook event
+    object_kind: str
     event_type: Optional[str] = None
     user: Optional[User] = None
     project: Optional[ProjectInfo] = None
@@ -49,14 +51,17 @@ class GitLabWebhook(BaseModel):
     merge_request: Optional[MergeRequest] = None
 
 
-class WebhookResponse(BaseModel):
+class WebhookResponse(msgspec.Struct, omit_defaults=True):
     status: str
     event_type: Optional[str] = None
     project: Optional[str] = None
     message: Optional[str] = None
 
 
-class HealthResponse(BaseModel):
+class HealthResponse(msgspec.Struct, omit_defaults=True):
     status: str
     service: str
     gitlab_url: str
+
+
+_webhook_decoder = msgspec.json.Decoder(GitLabWebhook)
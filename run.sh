@@ -44,4 +44,5 @@ echo "Starting server on ${HOST}:${PORT}..."
 echo "Press Ctrl+C to stop"
 echo "=========================================="
 
-exec uv run uvicorn app:app --host "${HOST}" --port "${PORT}" --reload
+exec uv run uvicorn app:app --host "${HOST}" --port "${PORT}" --reload \
+    --no-access-log --log-level warning
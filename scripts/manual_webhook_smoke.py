@@ -1,30 +1,35 @@
+import asyncio
 import json
 import os
 from typing import Any
 
-import requests
+import httpx
 from dotenv import load_dotenv
 
 load_dotenv()
 
 BASE_URL = "http://localhost:8585"
 
+_user = {
+    "id": 1,
+    "name": "Test User",
+    "username": "testuser",
+    "email": "test@example.com",
+}
+
+_project = {
+    "id": 123,
+    "name": "nidai",
+    "description": "Test project",
+    "web_url": "https://nid-gitlab.ad.speechpro.com/nid/nidai",
+    "path_with_namespace": "nid/nidai",
+}
+
 sample_mr_payload = {
     "object_kind": "merge_request",
     "event_type": "merge_request",
-    "user": {
-        "id": 1,
-        "name": "Test User",
-        "username": "testuser",
-        "email": "test@example.com",
-    },
-    "project": {
-        "id": 123,
-        "name": "nidai",
-        "description": "Test project",
-        "web_url": "https://nid-gitlab.ad.speechpro.com/nid/nidai",
-        "path_with_namespace": "nid/nidai",
-    },
+    "user": _user,
+    "project": _project,
     "object_attributes": {
         "id": 456,
         "iid": 42,
@@ -45,41 +50,38 @@ sample_mr_payload = {
     },
 }
 
-sample_note_payload = {
-    "object_kind": "note",
-    "event_type": "note",
-    "user": {
-        "id": 1,
-        "name": "Test User",
-        "username": "testuser",
-        "email": "test@example.com",
-    },
-    "project": {
-        "id": 123,
-        "name": "nidai",
-        "web_url": "https://nid-gitlab.ad.speechpro.com/nid/nidai",
-        "path_with_namespace": "nid/nidai",
-    },
-    "object_attributes": {
-        "id": 789,
-        "note": "/oc_test",
-        "noteable_type": "MergeRequest",
-        "noteable_iid": 42,
-    },
+# Note bodies to send, with the webhook status each one should produce.
+NOTE_CASES = {
+    "/oc_test": "accepted",
+    "Looks good to me": "ignored",
 }
 
 
-def _print_response(name: str, response: requests.Response) -> None:
+def sample_note_payload(note: str) -> dict[str, Any]:
+    return {
+        "object_kind": "note",
+        "event_type": "note",
+        "user": _user,
+        "project": _project,
+        "object_attributes": {
+            "id": 789,
+            "note": note,
+            "noteable_type": "MergeRequest",
+            "noteable_iid": 42,
+        },
+    }
+
+
+def _print_response(name: str, response: httpx.Response) -> None:
     print(f"\n=== {name} ===")
     print(f"Status: {response.status_code}")
     print(f"Response: {json.dumps(response.json(), indent=2)}")
 
 
-def test_health() -> bool:
+async def test_health(client: httpx.AsyncClient) -> bool:
     """Smoke test the health endpoint."""
-    print("\n=== Testing Health Endpoint ===")
     try:
-        response = requests.get(f"{BASE_URL}/health")
+        response = await client.get(f"{BASE_URL}/health")
         _print_response("Testing Health Endpoint", response)
         return response.status_code == 200
     except Exception as exc:
@@ -87,10 +89,10 @@ def test_health() -> bool:
         return False
 
 
-def test_mr_webhook() -> bool:
+async def test_mr_webhook(client: httpx.AsyncClient) -> bool:
     """Smoke test the merge request webhook."""
     try:
-        response = requests.post(f"{BASE_URL}/webhook", json=sample_mr_payload)
+        response = await client.post(f"{BASE_URL}/webhook", json=sample_mr_payload)
         _print_response("Testing Merge Request Webhook", response)
         return response.status_code == 200
     except Exception as exc:
@@ -98,19 +100,25 @@ def test_mr_webhook() -> bool:
         return False
 
 
-def test_note_webhook() -> bool:
-    """Smoke test the note webhook."""
+async def test_note_webhook(client: httpx.AsyncClient, note: str, expected: str) -> bool:
+    """Smoke test the note webhook with one note body."""
     try:
-        response = requests.post(f"{BASE_URL}/webhook", json=sample_note_payload)
-        _print_response("Testing Note Webhook", response)
-        return response.status_code == 200
+        response = await client.post(
+            f"{BASE_URL}/webhook", json=sample_note_payload(note)
+        )
+        _print_response(f"Testing Note Webhook ({note})", response)
+        return response.status_code == 200 and response.json().get("status") == expected
     except Exception as exc:
         print(f"Error: {exc}")
         return False
 
 
-def post_gitlab_comment(
-    project_id: int, mr_iid: int, comment_text: str, gitlab_token: str
+async def post_gitlab_comment(
+    client: httpx.AsyncClient,
+    project_id: int,
+    mr_iid: int,
+    comment_text: str,
+    gitlab_token: str,
 ) -> dict[str, Any]:
     """Post a comment to a GitLab merge request."""
     gitlab_url = os.environ.get(
@@ -120,25 +128,26 @@ def post_gitlab_comment(
     headers = {"PRIVATE-TOKEN": gitlab_token}
     data = {"body": comment_text}
 
-    resp = requests.post(url, headers=headers, json=data)
+    resp = await client.post(url, headers=headers, json=data)
     resp.raise_for_status()
     return resp.json()
 
 
-def test_gitlab_comment() -> bool:
+async def test_gitlab_comment(client: httpx.AsyncClient) -> bool:
     """Smoke test posting a comment to GitLab."""
     gitlab_token = os.environ.get("GITLAB_PAT", "")
     if not gitlab_token:
         print("GITLAB_PAT not set in environment")
         return False
 
-    print("\n=== Testing GitLab Comment Post ===")
     try:
         project_id = sample_mr_payload["project"]["id"]
         mr_iid = sample_mr_payload["object_attributes"]["iid"]
         comment_text = "trigger OK"
 
-        resp_json = post_gitlab_comment(project_id, mr_iid, comment_text, gitlab_token)
+        resp_json = await post_gitlab_comment(
+            client, project_id, mr_iid, comment_text, gitlab_token
+        )
         print("\n=== Testing GitLab Comment Post ===")
         print("Status: 201")
         print(f"Response: {json.dumps(resp_json, indent=2)}")
@@ -149,16 +158,23 @@ def test_gitlab_comment() -> bool:
         return False
 
 
-if __name__ == "__main__":
+async def main() -> bool:
     print("Testing GitLab AI Code Reviewer Webhook Service")
     print(f"Base URL: {BASE_URL}")
 
-    results = {
-        "health": test_health(),
-        "mr_webhook": test_mr_webhook(),
-        "note_webhook": test_note_webhook(),
-        "gitlab_comment": test_gitlab_comment(),
-    }
+    # One pooled client; the checks are independent, so they run concurrently.
+    async with httpx.AsyncClient(timeout=30) as client:
+        checks = {
+            "health": test_health(client),
+            "mr_webhook": test_mr_webhook(client),
+            **{
+                f"note_webhook[{note}]": test_note_webhook(client, note, expected)
+                for note, expected in NOTE_CASES.items()
+            },
+            "gitlab_comment": test_gitlab_comment(client),
+        }
+        outcomes = await asyncio.gather(*checks.values())
+    results = dict(zip(checks, outcomes))
 
     print("\n=== Test Results ===")
     for test, result in results.items():
@@ -167,3 +183,8 @@ if __name__ == "__main__":
 
     all_passed = all(results.values())
     print(f"\nOverall: {'✓ ALL TESTS PASSED' if all_passed else '✗ SOME TESTS FAILED'}")
+    return all_passed
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
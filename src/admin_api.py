@@ -11,6 +11,7 @@ from typing import Any
 from fastapi import APIRouter, HTTPException
 
 from src.opencode_command import opencode_command_args
+from src.pipelines.base import WORKSPACE_MODES
 from src.pipelines.builder import (
     PipelineBuildConfig,
     STAGE_BLOCKS,
@@ -605,7 +606,7 @@ def get_metadata() -> dict[str, Any]:
         "agent_options": agent_options,
         "models": [option["name"] for option in model_options],
         "model_options": model_options,
-        "workspace_modes": ["fresh_clone"],
+        "workspace_modes": list(WORKSPACE_MODES),
         "checkout_strategies": ["source_branch", "explicit_ref"],
         "output_post_modes": ["new_note", "update_progress_note"],
         "available_stages": available_stage_metadata(),
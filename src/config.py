@@ -0,0 +1,43 @@
+"""Settings read once from the environment when the service starts."""
+
+import os
+from types import MappingProxyType
+from typing import Final, Mapping
+from urllib.parse import urlsplit, urlunsplit
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def strip_gitlab_suffix(path: str) -> str:
+    if "/api/" in path:
+        return path.split("/api/", 1)[0]
+    if "/-/" in path:
+        return path.split("/-/", 1)[0]
+    if path.endswith("/-"):
+        return path[:-2]
+    return path
+
+
+def normalize_base_url(url: str) -> str:
+    """Reduce a GitLab URL (instance, project or API) to the instance root."""
+    parsed = urlsplit(url.rstrip("/"))
+    return urlunsplit(
+        (parsed.scheme, parsed.netloc, strip_gitlab_suffix(parsed.path.rstrip("/")), "", "")
+    ).rstrip("/")
+
+
+GITLAB_URL: Final = os.getenv("GITLAB_URL", "https://gitlab.example.com")
+GITLAB_BASE: Final = normalize_base_url(GITLAB_URL)
+GITLAB_PAT: Final = os.getenv("GITLAB_PAT", "")
+GITLAB_USER: Final = os.getenv("GITLAB_USER", "").strip().lstrip("@")
+HEADERS: Final[Mapping[str, str]] = MappingProxyType({"PRIVATE-TOKEN": GITLAB_PAT})
+
+# Matches the pipelines' documented maxConcurrentRuns of 1.
+OPENCODE_MAX_CONCURRENT_RUNS: Final = max(
+    1, int(os.getenv("OPENCODE_MAX_CONCURRENT_RUNS", "1"))
+)
+
+HOST: Final = os.getenv("HOST", "0.0.0.0")
+PORT: Final = int(os.getenv("PORT", "8585"))
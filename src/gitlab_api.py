@@ -1,21 +1,26 @@
+import ipaddress
 import logging
-import os
+from types import MappingProxyType
 from typing import Mapping, Optional
 from urllib.parse import urlsplit, urlunsplit
+from urllib.request import getproxies
 
-import requests
+import httpx
+import orjson
+
+from .config import GITLAB_BASE, GITLAB_PAT, HEADERS, normalize_base_url
 
 logger = logging.getLogger(__name__)
 
+GITLAB_HTTP_TIMEOUT = 15
+GITLAB_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+# Connection-level retries only: a failed connect never reached GitLab, so even
+# note POSTs are safe to resend.
+GITLAB_HTTP_RETRIES = 3
+
+JSON_CONTENT_TYPE: Mapping[str, str] = MappingProxyType({"Content-Type": "application/json"})
 
-def _strip_gitlab_suffix(path: str) -> str:
-    if "/api/" in path:
-        return path.split("/api/", 1)[0]
-    if "/-/" in path:
-        return path.split("/-/", 1)[0]
-    if path.endswith("/-"):
-        return path[:-2]
-    return path
+_client: Optional[httpx.AsyncClient] = None
 
 
 def _normalize_project_url(project_url: str) -> str:
@@ -47,9 +52,9 @@ def _derive_base_url_from_project(project: Optional[Mapping[str, object]]) -> Op
             parts = [part for part in project_path.split("/") if part]
             base_path = "/" + "/".join(parts[:-2]) if len(parts) > 2 else ""
 
-        return urlunsplit(
-            (parsed.scheme, parsed.netloc, _strip_gitlab_suffix(base_path.rstrip("/")), "", "")
-        ).rstrip("/")
+        return normalize_base_url(
+            urlunsplit((parsed.scheme, parsed.netloc, base_path, "", ""))
+        )
 
     return None
 
@@ -61,19 +66,23 @@ def normalize_gitlab_url(
     if derived:
         return derived
 
-    base_url = (gitlab_url or os.getenv("GITLAB_URL", "https://gitlab.example.com")).rstrip("/")
-    parsed = urlsplit(base_url)
-    return urlunsplit(
-        (parsed.scheme, parsed.netloc, _strip_gitlab_suffix(parsed.path.rstrip("/")), "", "")
-    ).rstrip("/")
+    if gitlab_url is None:
+        return GITLAB_BASE
+    return normalize_base_url(gitlab_url)
 
 
-def extract_noteable_iid(payload: dict) -> Optional[int]:
+def extract_noteable_iid(payload: dict, noteable_type: Optional[str] = None) -> Optional[int]:
+    """Return the issue or MR iid a note belongs to.
+
+    Callers that already resolved ``noteable_type`` can pass it so the payload
+    is not consulted for it again.
+    """
     attributes = payload.get("object_attributes", {})
-    noteable_type = attributes.get("noteable_type")
     noteable_iid = attributes.get("noteable_iid")
     if noteable_iid:
         return noteable_iid
+    if noteable_type is None:
+        noteable_type = attributes.get("noteable_type")
     if noteable_type == "MergeRequest":
         return payload.get("merge_request", {}).get("iid")
     if noteable_type == "Issue":
@@ -81,18 +90,81 @@ def extract_noteable_iid(payload: dict) -> Optional[int]:
     return attributes.get("noteable_id")
 
 
-def is_self_authored_note(payload: dict, bot_username: str) -> bool:
+def is_self_authored_note(author_username: Optional[str], bot_username: str) -> bool:
     normalized_username = bot_username.strip().lstrip("@")
     if not normalized_username:
         return False
-    author_username = str(payload.get("user", {}).get("username") or "").strip()
-    return author_username == normalized_username
+    return (author_username or "").strip() == normalized_username
+
 
+def _gitlab_transport(proxy: Optional[str] = None) -> httpx.AsyncHTTPTransport:
+    return httpx.AsyncHTTPTransport(
+        proxy=proxy, http2=True, limits=GITLAB_HTTP_LIMITS, retries=GITLAB_HTTP_RETRIES
+    )
 
-def post_gitlab_note(project_id, noteable_type, noteable_iid, body, project=None):
+
+def _no_proxy_pattern(host: str) -> str:
+    if "://" in host:
+        return host
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return f"all://{host}" if host.lower() == "localhost" else f"all://*{host}"
+    return f"all://[{host}]" if address.version == 6 else f"all://{host}"
+
+
+def _environment_proxy_mounts() -> dict[str, Optional[httpx.AsyncHTTPTransport]]:
+    """Mirror httpx's HTTP(S)_PROXY/ALL_PROXY/NO_PROXY handling for a custom transport.
+
+    httpx ignores the environment once ``transport=`` is given, so the proxy
+    routes are rebuilt here with the same retrying transport. ``None`` sends a
+    NO_PROXY host through the client's direct transport.
+    """
+    proxies = getproxies()
+    no_proxy = [host.strip() for host in proxies.get("no", "").split(",")]
+    if "*" in no_proxy:
+        return {}
+
+    mounts: dict[str, Optional[httpx.AsyncHTTPTransport]] = {}
+    for scheme in ("http", "https", "all"):
+        proxy = proxies.get(scheme)
+        if proxy:
+            mounts[f"{scheme}://"] = _gitlab_transport(
+                proxy if "://" in proxy else f"http://{proxy}"
+            )
+    for host in filter(None, no_proxy):
+        mounts[_no_proxy_pattern(host)] = None
+    return mounts
+
+
+def get_gitlab_client() -> httpx.AsyncClient:
+    """Return the application-scoped GitLab HTTP client, creating it on first use.
+
+    The client carries the PRIVATE-TOKEN header, so callers only add what is
+    specific to their request.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            transport=_gitlab_transport(),
+            mounts=_environment_proxy_mounts(),
+            headers=HEADERS,
+            timeout=GITLAB_HTTP_TIMEOUT,
+            follow_redirects=True,
+        )
+    return _client
+
+
+async def close_gitlab_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def post_gitlab_note(project_id, noteable_type, noteable_iid, body, project=None):
     """Post a note (comment) to a GitLab issue or MR."""
-    gitlab_pat = os.getenv("GITLAB_PAT", "")
-    if not gitlab_pat:
+    if not GITLAB_PAT:
         logger.warning("GITLAB_PAT not configured, cannot post note")
         return None
 
@@ -105,16 +177,15 @@ def post_gitlab_note(project_id, noteable_type, noteable_iid, body, project=None
         logger.warning("Unsupported noteable_type: %s", noteable_type)
         return None
 
-    headers = {"PRIVATE-TOKEN": gitlab_pat}
-    data = {"body": body}
-
     logger.debug("Posting note to %s", url)
     resp = None
     try:
-        resp = requests.post(url, headers=headers, json=data, timeout=15)
+        resp = await get_gitlab_client().post(
+            url, headers=JSON_CONTENT_TYPE, content=orjson.dumps({"body": body})
+        )
         resp.raise_for_status()
         logger.info("Posted note to %s #%s", noteable_type, noteable_iid)
-        return resp.json()
+        return orjson.loads(resp.content)
     except Exception as exc:
         logger.error("Failed to post note: %s", exc)
         if resp is not None:
@@ -1,10 +1,15 @@
 from dataclasses import dataclass, field
 from typing import Optional, Dict, Any, List
+import asyncio
 import logging
 import shutil
 
+from src.gitlab_api import extract_noteable_iid
+
 logger = logging.getLogger(__name__)
 
+WORKSPACE_MODES = ("fresh_clone", "repo_cache")
+
 
 @dataclass(frozen=True)
 class WorkspaceConfig:
@@ -28,13 +33,27 @@ class PipelineContext:
     webhook_payload: Dict[str, Any]
     command: Optional[str] = None
     project_info: Optional[Dict[str, Any]] = None
+    project_id: Optional[int] = None
+    noteable_iid: Optional[int] = None
     code_snapshot: Optional[Dict[str, Any]] = None
     local_context_path: Optional[str] = None
     workspace_cleanup_required: bool = False
+    workspace_mirror_path: Optional[str] = None
     agent_result: Optional["AgentResult"] = None
     gitlab_note_id: Optional[int] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
 
+    def __post_init__(self) -> None:
+        # Resolve the identifiers most stages need once, not per stage.
+        if self.project_info is None:
+            self.project_info = self.webhook_payload.get("project") or {}
+        if self.project_id is None:
+            self.project_id = self.project_info.get("id")
+        if self.noteable_iid is None:
+            self.noteable_iid = extract_noteable_iid(
+                self.webhook_payload, self.metadata.get("noteable_type")
+            )
+
 
 @dataclass
 class AgentResult:
@@ -58,20 +77,22 @@ class StageResult:
 class Stage:
     """Base class for all pipeline stages"""
 
-    def execute(self, context: PipelineContext) -> StageResult:
-        """Execute stage - synchronous"""
+    async def execute(self, context: PipelineContext) -> StageResult:
+        """Execute stage on the running event loop"""
         try:
-            logger.info(f"Executing stage: {self.__class__.__name__}")
-            result = self._execute(context)
-            logger.info(f"Completed stage: {self.__class__.__name__}")
+            logger.info("Executing stage: %s", self.__class__.__name__)
+            result = await self._execute(context)
+            logger.info("Completed stage: %s", self.__class__.__name__)
             return result
         except Exception as e:
-            logger.error(f"Stage {self.__class__.__name__} failed: {e}", exc_info=True)
+            logger.error(
+                "Stage %s failed: %s", self.__class__.__name__, e, exc_info=True
+            )
             return StageResult(
                 context=context, should_stop=True, error=e, success=False
             )
 
-    def _execute(self, context: PipelineContext) -> StageResult:
+    async def _execute(self, context: PipelineContext) -> StageResult:
         """Actual implementation of stage logic"""
         raise NotImplementedError
 
@@ -83,29 +104,43 @@ class Pipeline:
         self.name = name
         self.stages = stages
 
-    def execute(self, context: PipelineContext) -> StageResult:
+    async def execute(self, context: PipelineContext) -> StageResult:
         """Execute all stages until completion or stop"""
-        logger.info(f"Starting pipeline: {self.name}")
+        logger.info("Starting pipeline: %s", self.name)
 
         try:
             for stage in self.stages:
-                result = stage.execute(context)
+                result = await stage.execute(context)
                 context = result.context
 
                 if result.should_stop:
                     if result.error:
                         context.metadata["pipeline_error"] = str(result.error)
                         logger.error(
-                            f"Pipeline {self.name} stopped with error: {result.error}"
+                            "Pipeline %s stopped with error: %s", self.name, result.error
                         )
                     else:
-                        logger.info(f"Pipeline {self.name} stopped early")
+                        logger.info("Pipeline %s stopped early", self.name)
                     return result
 
-            logger.info(f"Pipeline {self.name} completed successfully")
+            logger.info("Pipeline %s completed successfully", self.name)
             return StageResult(context=context, should_stop=False, success=True)
         finally:
-            for attr_name in ["local_context_path"]:
-                path = getattr(context, attr_name, None)
-                if path and context.workspace_cleanup_required:
-                    shutil.rmtree(path, ignore_errors=True)
+            await self._cleanup_workspace(context)
+
+    async def _cleanup_workspace(self, context: PipelineContext) -> None:
+        path = context.local_context_path
+        if not path or not context.workspace_cleanup_required:
+            return
+
+        if context.workspace_mirror_path:
+            from .repo_cache import get_repo_cache
+
+            try:
+                await get_repo_cache().remove_worktree(
+                    context.workspace_mirror_path, path
+                )
+            except Exception as exc:
+                logger.warning("Failed to remove worktree %s: %s", path, exc)
+
+        await asyncio.to_thread(shutil.rmtree, path, True)
@@ -3,7 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Any, Callable
 
-from .base import Pipeline, PreparationConfig, Stage, WorkspaceConfig
+from .base import WORKSPACE_MODES, Pipeline, PreparationConfig, Stage, WorkspaceConfig
 
 
 @dataclass(frozen=True)
@@ -141,7 +141,7 @@ STAGE_BLOCKS: dict[str, StageBlock] = {
     "WorkspaceAcquisitionStage": StageBlock(
         id="WorkspaceAcquisitionStage",
         name="Workspace Acquisition",
-        description="Clone repository into local workspace",
+        description="Clone repository or check out a cached worktree",
         factory=_workspace_stage,
         provider="git",
         category="workspace",
@@ -151,7 +151,7 @@ STAGE_BLOCKS: dict[str, StageBlock] = {
                 "key": "mode",
                 "label": "Workspace Mode",
                 "type": "select",
-                "options": ["fresh_clone"],
+                "options": list(WORKSPACE_MODES),
                 "default": "fresh_clone",
             },
             {
@@ -60,7 +60,7 @@ class Command(ABC):
 
     @property
     def workspace_config(self) -> WorkspaceConfig:
-        return WorkspaceConfig(mode="fresh_clone", cleanup_required=True)
+        return WorkspaceConfig(mode="repo_cache", cleanup_required=True)
 
     @property
     def preparation_config(self) -> PreparationConfig:
@@ -104,6 +104,11 @@ class Command(ABC):
             default_context = block.context_schema.get("default", {})
             if isinstance(default_context, dict):
                 context_handling[stage_id] = dict(default_context)
+        if "WorkspaceAcquisitionStage" in stage_ids:
+            step_settings["WorkspaceAcquisitionStage"] = {
+                **step_settings.get("WorkspaceAcquisitionStage", {}),
+                "mode": self.workspace_config.mode,
+            }
         if "OpencodeIntegrationStage" in stage_ids:
             step_settings["OpencodeIntegrationStage"] = {
                 **step_settings.get("OpencodeIntegrationStage", {}),
@@ -138,7 +143,7 @@ class Command(ABC):
                 "maxConcurrentRuns": 1,
             },
             "workspace": {
-                "mode": "fresh_clone",
+                "mode": self.workspace_config.mode,
                 "cleanupAfterRun": True,
                 "checkoutStrategy": "source_branch",
             },
@@ -1,5 +1,5 @@
 import re
-from typing import Optional, List
+from typing import Dict, Optional, List
 from .commands.base import Command
 from .commands.oc_review import ReviewCommand
 from .commands.oc_ask import AskCommand
@@ -17,13 +17,24 @@ COMMANDS: List[Command] = [
     DeepReviewCommand(),
 ]
 
+_COMMAND_BY_TRIGGER: Dict[str, Command] = {
+    command.trigger_pattern: command for command in COMMANDS
+}
+_COMMAND_BY_NAME: Dict[str, Command] = {command.name: command for command in COMMANDS}
+# Longest triggers first so a trigger that prefixes another cannot shadow it.
+_TRIGGER_SCANNER = re.compile(
+    "|".join(map(re.escape, sorted(_COMMAND_BY_TRIGGER, key=len, reverse=True)))
+)
+# Built on first use so stage defaults pick up the loaded environment.
+_PIPELINE_BY_NAME: Dict[str, Pipeline] = {}
+
 
 def detect_command(text: str) -> Optional[Command]:
-    """Detect command from text"""
-    for command in COMMANDS:
-        if command.trigger_pattern in text:
-            return command
-    return None
+    """Detect the first command trigger in text"""
+    match = _TRIGGER_SCANNER.search(text)
+    if match is None:
+        return None
+    return _COMMAND_BY_TRIGGER[match.group()]
 
 
 def contains_user_mention(text: str, username: str) -> bool:
@@ -36,8 +47,15 @@ def contains_user_mention(text: str, username: str) -> bool:
 
 
 def get_pipeline_for_command(command_name: str) -> Optional[Pipeline]:
-    """Get pipeline by command name"""
-    for command in COMMANDS:
-        if command.name == command_name:
-            return command.get_pipeline()
-    return None
+    """Get the shared pipeline for a command name.
+
+    Stages keep no per-run state, so one pipeline per command is reused across
+    webhooks instead of rebuilding every stage on each call.
+    """
+    pipeline = _PIPELINE_BY_NAME.get(command_name)
+    if pipeline is None:
+        command = _COMMAND_BY_NAME.get(command_name)
+        if command is None:
+            return None
+        pipeline = _PIPELINE_BY_NAME[command_name] = command.get_pipeline()
+    return pipeline
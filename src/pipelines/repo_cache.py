@@ -0,0 +1,110 @@
+import asyncio
+import base64
+import logging
+import os
+import subprocess
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPO_CACHE_DIR = os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "gitbard",
+)
+# Keeps the mirror's branches in step with the remote on every acquisition.
+BRANCHES_REFSPEC = "+refs/heads/*:refs/heads/*"
+
+
+async def run_git(
+    args: list[str], cwd: str | None = None, env: dict[str, str] | None = None
+) -> subprocess.CompletedProcess:
+    # A missing or rejected token must fail the command, not wait on a prompt.
+    env = {**(env or os.environ), "GIT_TERMINAL_PROMPT": "0"}
+    return await asyncio.to_thread(
+        subprocess.run, args, cwd=cwd, env=env, check=True, capture_output=True
+    )
+
+
+def git_auth_env(token: str | None) -> dict[str, str] | None:
+    """Environment that authenticates git over HTTP without persisting ``token``.
+
+    The header is injected through ``GIT_CONFIG_*`` so it never lands in the
+    mirror's ``config`` file or in the process argument list.
+    """
+    if not token:
+        return None
+    credentials = base64.b64encode(f"gitlab:{token}".encode()).decode()
+    return {
+        **os.environ,
+        "GIT_CONFIG_COUNT": "1",
+        "GIT_CONFIG_KEY_0": "http.extraHeader",
+        "GIT_CONFIG_VALUE_0": f"Authorization: Basic {credentials}",
+    }
+
+
+class RepoCache:
+    """Per-project bare mirrors that hand out detached worktrees.
+
+    Mirrors are full clones: a blob filter would leave worktrees fetching
+    blobs lazily, and those fetches run without the token.
+    """
+
+    def __init__(self, cache_dir: str | None = None):
+        self.cache_dir = Path(
+            cache_dir or os.getenv("GITBARD_REPO_CACHE_DIR", DEFAULT_REPO_CACHE_DIR)
+        ).expanduser()
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    def mirror_path(self, project_id: object) -> str:
+        return str(self.cache_dir / f"{project_id}.git")
+
+    def _lock(self, mirror: str) -> asyncio.Lock:
+        return self._locks.setdefault(mirror, asyncio.Lock())
+
+    async def add_worktree(
+        self,
+        project_id: object,
+        remote_url: str,
+        repo_dir: str,
+        revision: str,
+        token: str | None = None,
+    ) -> str:
+        """Fetch ``revision`` into the project mirror and check it out at ``repo_dir``."""
+        mirror = self.mirror_path(project_id)
+        env = git_auth_env(token)
+        async with self._lock(mirror):
+            if os.path.isdir(mirror):
+                await run_git(["git", "remote", "set-url", "origin", remote_url], cwd=mirror)
+            else:
+                logger.info("Creating repo cache mirror at %s", mirror)
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                await run_git(["git", "clone", "--bare", remote_url, mirror], env=env)
+
+            # ``revision`` goes first so it is the entry FETCH_HEAD resolves to.
+            await run_git(
+                ["git", "fetch", "--prune", "origin", revision, BRANCHES_REFSPEC],
+                cwd=mirror,
+                env=env,
+            )
+            # Drop registrations left behind by worktrees that were never removed.
+            await run_git(["git", "worktree", "prune"], cwd=mirror)
+            await run_git(
+                ["git", "worktree", "add", "--detach", repo_dir, "FETCH_HEAD"],
+                cwd=mirror,
+                env=env,
+            )
+        return mirror
+
+    async def remove_worktree(self, mirror: str, repo_dir: str) -> None:
+        async with self._lock(mirror):
+            await run_git(["git", "worktree", "remove", "--force", repo_dir], cwd=mirror)
+
+
+_repo_cache: RepoCache | None = None
+
+
+def get_repo_cache() -> RepoCache:
+    global _repo_cache
+    if _repo_cache is None:
+        _repo_cache = RepoCache()
+    return _repo_cache
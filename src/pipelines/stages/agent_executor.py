@@ -10,7 +10,7 @@ class AgentExecutorStage(Stage):
     def __init__(self, agent_type: str):
         self.agent_type = agent_type
 
-    def _execute(self, context: PipelineContext) -> StageResult:
+    async def _execute(self, context: PipelineContext) -> StageResult:
         if self.agent_type == "review":
             prompt = self._build_review_prompt(context)
         elif self.agent_type == "general":
@@ -25,7 +25,7 @@ class AgentExecutorStage(Stage):
         )
         context.agent_result = result
 
-        logger.info(f"Agent {self.agent_type} executed")
+        logger.info("Agent %s executed", self.agent_type)
 
         return StageResult(context=context, should_stop=False)
 
@@ -1,5 +1,6 @@
-from ..base import Stage, StageResult, PipelineContext, WorkspaceConfig
-import os
+from ..base import WORKSPACE_MODES, Stage, StageResult, PipelineContext, WorkspaceConfig
+from ..repo_cache import RepoCache, get_repo_cache, run_git
+from src.config import GITLAB_PAT
 import tempfile
 import subprocess
 import logging
@@ -10,17 +11,21 @@ logger = logging.getLogger(__name__)
 class WorkspaceAcquisitionStage(Stage):
     """Build a working directory for the pipeline."""
 
-    def __init__(self, workspace_config: WorkspaceConfig | None = None):
+    def __init__(
+        self,
+        workspace_config: WorkspaceConfig | None = None,
+        repo_cache: RepoCache | None = None,
+    ):
         self.workspace_config = workspace_config or WorkspaceConfig()
+        self.repo_cache = repo_cache
 
-    def _execute(self, context: PipelineContext) -> StageResult:
-        if self.workspace_config.mode != "fresh_clone":
+    async def _execute(self, context: PipelineContext) -> StageResult:
+        if self.workspace_config.mode not in WORKSPACE_MODES:
             raise ValueError(
                 f"Unsupported workspace mode: {self.workspace_config.mode}"
             )
 
-        payload = context.webhook_payload
-        project = payload.get("project", {})
+        project = context.project_info
 
         temp_dir = tempfile.mkdtemp(prefix="opencode_")
         context.local_context_path = temp_dir
@@ -33,39 +38,114 @@ class WorkspaceAcquisitionStage(Stage):
         if not git_http_url:
             raise ValueError("No git_http_url in project")
 
-        gitlab_pat = os.getenv("GITLAB_PAT", "")
+        if self.workspace_config.mode == "repo_cache":
+            await self._add_cached_worktree(context, git_http_url, GITLAB_PAT, temp_dir)
+        else:
+            auth_url = git_http_url.replace("https://", f"https://gitlab:{GITLAB_PAT}@")
+            await self._clone_snapshot(context, auth_url, temp_dir)
 
-        auth_url = git_http_url.replace("https://", f"https://gitlab:{gitlab_pat}@")
+        logger.info("Built local context at: %s", temp_dir)
 
-        subprocess.run(
-            ["git", "clone", auth_url, temp_dir], check=True, capture_output=True
-        )
+        return StageResult(context=context, should_stop=False)
+
+    async def _clone_snapshot(
+        self, context: PipelineContext, auth_url: str, repo_dir: str
+    ) -> None:
+        snapshot = context.code_snapshot or {}
+        if snapshot.get("sha"):
+            await self._fetch_revision(auth_url, repo_dir, snapshot["sha"])
+        elif snapshot.get("branch"):
+            await self._clone_branch_or_merge_request_ref(context, auth_url, repo_dir)
+        else:
+            await run_git(["git", "clone", "--depth", "1", auth_url, repo_dir])
+
+    async def _add_cached_worktree(
+        self,
+        context: PipelineContext,
+        git_http_url: str,
+        gitlab_pat: str,
+        repo_dir: str,
+    ) -> None:
+        project_id = context.project_id
+        if not project_id:
+            raise ValueError("No project id available for repo cache")
+
+        repo_cache = self.repo_cache or get_repo_cache()
 
-        if context.code_snapshot.get("sha"):
-            subprocess.run(
-                ["git", "checkout", context.code_snapshot["sha"]],
-                cwd=temp_dir,
-                check=True,
-                capture_output=True,
+        snapshot = context.code_snapshot or {}
+        branch = snapshot.get("branch")
+        if snapshot.get("sha"):
+            revision = snapshot["sha"]
+        elif branch:
+            revision = f"refs/heads/{branch}"
+        else:
+            revision = "HEAD"
+
+        try:
+            context.workspace_mirror_path = await repo_cache.add_worktree(
+                project_id, git_http_url, repo_dir, revision, token=gitlab_pat
             )
-        elif context.code_snapshot.get("branch"):
-            self._checkout_branch_or_merge_request_ref(context, temp_dir)
+            return
+        except subprocess.CalledProcessError as exc:
+            mr_iid = snapshot.get("merge_request_iid")
+            if snapshot.get("sha") or not branch or not mr_iid:
+                raise
 
-        logger.info(f"Built local context at: {temp_dir}")
+            logger.info(
+                "Branch %s is unavailable, attempting merge request ref for !%s",
+                branch,
+                mr_iid,
+            )
 
-        return StageResult(context=context, should_stop=False)
+            try:
+                context.workspace_mirror_path = await repo_cache.add_worktree(
+                    project_id,
+                    git_http_url,
+                    repo_dir,
+                    f"refs/merge-requests/{mr_iid}/head",
+                    token=gitlab_pat,
+                )
+            except subprocess.CalledProcessError:
+                raise self._missing_source_branch_error(branch, mr_iid, exc) from exc
+
+    async def _fetch_revision(self, auth_url: str, repo_dir: str, revision: str) -> None:
+        """Fetch a single revision without history and check it out detached."""
+        await run_git(["git", "init", "--quiet", repo_dir])
+        await run_git(["git", "remote", "add", "origin", auth_url], cwd=repo_dir)
+        await run_git(
+            [
+                "git",
+                "-c",
+                "protocol.version=2",
+                "fetch",
+                "--depth",
+                "1",
+                "--filter=blob:none",
+                "origin",
+                revision,
+            ],
+            cwd=repo_dir,
+        )
+        await run_git(["git", "checkout", "--quiet", "FETCH_HEAD"], cwd=repo_dir)
 
-    def _checkout_branch_or_merge_request_ref(
-        self, context: PipelineContext, repo_dir: str
+    async def _clone_branch_or_merge_request_ref(
+        self, context: PipelineContext, auth_url: str, repo_dir: str
     ) -> None:
         branch = context.code_snapshot["branch"]
 
         try:
-            subprocess.run(
-                ["git", "checkout", branch],
-                cwd=repo_dir,
-                check=True,
-                capture_output=True,
+            await run_git(
+                [
+                    "git",
+                    "clone",
+                    "--depth",
+                    "1",
+                    "--branch",
+                    branch,
+                    "--single-branch",
+                    auth_url,
+                    repo_dir,
+                ]
             )
             return
         except subprocess.CalledProcessError as exc:
@@ -79,31 +159,25 @@ class WorkspaceAcquisitionStage(Stage):
                 mr_iid,
             )
 
-            local_ref = f"mr-{mr_iid}"
-            refspec = f"refs/merge-requests/{mr_iid}/head:refs/heads/{local_ref}"
-
             try:
-                subprocess.run(
-                    ["git", "fetch", "origin", refspec],
-                    cwd=repo_dir,
-                    check=True,
-                    capture_output=True,
-                )
-                subprocess.run(
-                    ["git", "checkout", local_ref],
-                    cwd=repo_dir,
-                    check=True,
-                    capture_output=True,
+                await self._fetch_revision(
+                    auth_url, repo_dir, f"refs/merge-requests/{mr_iid}/head"
                 )
                 return
             except subprocess.CalledProcessError:
-                stderr = exc.stderr.decode("utf-8", errors="ignore").strip()
-                raise RuntimeError(
-                    "Failed to check out source branch "
-                    f"'{branch}'. The source branch may have been deleted and "
-                    f"merge request ref !{mr_iid} is no longer available."
-                    + (f" Original git error: {stderr}" if stderr else "")
-                ) from exc
+                raise self._missing_source_branch_error(branch, mr_iid, exc) from exc
+
+    @staticmethod
+    def _missing_source_branch_error(
+        branch: str, mr_iid: object, exc: subprocess.CalledProcessError
+    ) -> RuntimeError:
+        stderr = (exc.stderr or b"").decode("utf-8", errors="ignore").strip()
+        return RuntimeError(
+            "Failed to check out source branch "
+            f"'{branch}'. The source branch may have been deleted and "
+            f"merge request ref !{mr_iid} is no longer available."
+            + (f" Original git error: {stderr}" if stderr else "")
+        )
 
 
 class ContextBuilderStage(WorkspaceAcquisitionStage):
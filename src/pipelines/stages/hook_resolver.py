@@ -1,6 +1,6 @@
 from ..base import Stage, StageResult, PipelineContext
 import logging
-from src.gitlab_api import extract_noteable_iid, post_gitlab_note
+from src.gitlab_api import post_gitlab_note
 
 logger = logging.getLogger(__name__)
 
@@ -8,14 +8,15 @@ logger = logging.getLogger(__name__)
 class HookResolverStage(Stage):
     """Stage A: Detect commands from webhook and create initial note"""
 
-    def _execute(self, context: PipelineContext) -> StageResult:
+    async def _execute(self, context: PipelineContext) -> StageResult:
         payload = context.webhook_payload
 
         if payload.get("object_kind") != "note":
             return StageResult(context=context, should_stop=True)
 
-        note = payload.get("object_attributes", {}).get("note", "")
-        noteable_type = payload.get("object_attributes", {}).get("noteable_type")
+        attributes = payload.get("object_attributes", {})
+        note = attributes.get("note", "")
+        noteable_type = attributes.get("noteable_type")
 
         if note.startswith("🤖 OpenCode"):
             logger.info("Skipping note posted by ourselves")
@@ -32,7 +33,7 @@ class HookResolverStage(Stage):
             command = detect_command(note)
 
             if not command:
-                logger.info(f"No command detected in note: {note}")
+                logger.info("No command detected in note: %s", note)
                 return StageResult(context=context, should_stop=True)
 
             command_name = command.name
@@ -45,16 +46,13 @@ class HookResolverStage(Stage):
         context.metadata["trigger_pattern"] = trigger_pattern or command_name
         context.metadata["display_trigger"] = display_trigger or trigger_pattern or command_name
 
-        project_id = payload.get("project", {}).get("id")
-        noteable_iid = extract_noteable_iid(payload)
-
-        note_response = post_gitlab_note(
-            project_id,
+        note_response = await post_gitlab_note(
+            context.project_id,
             noteable_type,
-            noteable_iid,
+            context.noteable_iid,
             "🤖 OpenCode started working on "
             f"`{context.metadata['display_trigger']}`...",
-            project=payload.get("project"),
+            project=context.project_info,
         )
 
         if note_response:
@@ -1,14 +1,22 @@
+import asyncio
 import logging
 import os
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 
-import requests
+import httpx
+import orjson
 
 from ..base import Stage, StageResult, PipelineContext
-from src.gitlab_api import extract_noteable_iid, normalize_gitlab_url
+from src.config import GITLAB_PAT
+from src.gitlab_api import get_gitlab_client, normalize_gitlab_url
 
 logger = logging.getLogger(__name__)
 
+# GitLab's maximum page size; the default of 20 would multiply round-trips.
+NOTES_PER_PAGE = 100
+# Upper bound on notes pages requested at once for a single thread.
+NOTES_PAGE_CONCURRENCY = 4
+
 
 class IssueContextFetcherStage(Stage):
     """Fetch GitLab issue or MR thread content and store it locally."""
@@ -23,7 +31,7 @@ class IssueContextFetcherStage(Stage):
         self.write_to_workspace = write_to_workspace
         self.pass_to_next = pass_to_next
 
-    def _execute(self, context: PipelineContext) -> StageResult:
+    async def _execute(self, context: PipelineContext) -> StageResult:
         noteable_type = context.metadata.get("noteable_type")
         if noteable_type not in {"Issue", "MergeRequest"}:
             return StageResult(context=context, should_stop=False)
@@ -32,20 +40,20 @@ class IssueContextFetcherStage(Stage):
         if not repo_dir:
             raise ValueError("No local_context_path available for thread context")
 
-        project_id = context.webhook_payload.get("project", {}).get("id")
-        noteable_iid = extract_noteable_iid(context.webhook_payload)
+        project_id = context.project_id
+        noteable_iid = context.noteable_iid
 
         if not project_id or not noteable_iid:
             logger.info("Thread context skipped: missing project_id or noteable_iid")
             return StageResult(context=context, should_stop=False)
 
         if noteable_type == "Issue":
-            content = self._build_issue_content(
-                project_id, noteable_iid, context.webhook_payload.get("project")
+            content = await self._build_issue_content(
+                project_id, noteable_iid, context.project_info
             )
         else:
-            content = self._build_merge_request_content(
-                project_id, noteable_iid, context.webhook_payload.get("project")
+            content = await self._build_merge_request_content(
+                project_id, noteable_iid, context.project_info
             )
         if not content:
             logger.info("Thread context skipped: no content fetched")
@@ -67,34 +75,39 @@ class IssueContextFetcherStage(Stage):
 
         return StageResult(context=context, should_stop=False)
 
-    def _build_issue_content(
+    async def _build_issue_content(
         self, project_id: int, issue_iid: int, project: Optional[Dict[str, object]] = None
     ) -> Optional[str]:
-        gitlab_pat = os.getenv("GITLAB_PAT", "")
-        if not gitlab_pat:
+        if not GITLAB_PAT:
             logger.warning("GITLAB_PAT not configured, cannot fetch issue context")
             return None
 
         gitlab_url = normalize_gitlab_url(project=project)
 
-        headers = {"PRIVATE-TOKEN": gitlab_pat}
         issue_url = f"{gitlab_url}/api/v4/projects/{project_id}/issues/{issue_iid}"
         notes_url = (
             f"{gitlab_url}/api/v4/projects/{project_id}/issues/{issue_iid}/notes"
         )
 
+        client = get_gitlab_client()
         try:
-            issue_resp = requests.get(issue_url, headers=headers, timeout=15)
+            issue_resp, notes_resp = await asyncio.gather(
+                client.get(issue_url),
+                self._get_notes_page(client, notes_url, 1),
+            )
             issue_resp.raise_for_status()
-            notes_resp = requests.get(notes_url, headers=headers, timeout=15)
             notes_resp.raise_for_status()
-        except requests.RequestException as exc:
+            notes_pages = [
+                notes_resp,
+                *await self._get_remaining_notes_pages(client, notes_url, notes_resp),
+            ]
+        except httpx.HTTPError as exc:
             logger.error("Failed to fetch issue context: %s", exc)
             return None
 
         try:
-            issue = issue_resp.json()
-            notes = notes_resp.json()
+            issue = orjson.loads(issue_resp.content)
+            notes = self._load_notes(notes_pages)
         except ValueError as exc:
             logger.error(
                 "Issue context fetch returned non-JSON response for project %s issue %s: %s",
@@ -108,16 +121,14 @@ class IssueContextFetcherStage(Stage):
 
         return self._format_issue_markdown(issue, notes)
 
-    def _build_merge_request_content(
+    async def _build_merge_request_content(
         self, project_id: int, mr_iid: int, project: Optional[Dict[str, object]] = None
     ) -> Optional[str]:
-        gitlab_pat = os.getenv("GITLAB_PAT", "")
-        if not gitlab_pat:
+        if not GITLAB_PAT:
             logger.warning("GITLAB_PAT not configured, cannot fetch MR context")
             return None
 
         gitlab_url = normalize_gitlab_url(project=project)
-        headers = {"PRIVATE-TOKEN": gitlab_pat}
         mr_url = f"{gitlab_url}/api/v4/projects/{project_id}/merge_requests/{mr_iid}"
         notes_url = (
             f"{gitlab_url}/api/v4/projects/{project_id}/merge_requests/{mr_iid}/notes"
@@ -126,21 +137,28 @@ class IssueContextFetcherStage(Stage):
             f"{gitlab_url}/api/v4/projects/{project_id}/merge_requests/{mr_iid}/changes"
         )
 
+        client = get_gitlab_client()
         try:
-            mr_resp = requests.get(mr_url, headers=headers, timeout=15)
+            mr_resp, notes_resp, changes_resp = await asyncio.gather(
+                client.get(mr_url),
+                self._get_notes_page(client, notes_url, 1),
+                client.get(changes_url),
+            )
             mr_resp.raise_for_status()
-            notes_resp = requests.get(notes_url, headers=headers, timeout=15)
             notes_resp.raise_for_status()
-            changes_resp = requests.get(changes_url, headers=headers, timeout=15)
             changes_resp.raise_for_status()
-        except requests.RequestException as exc:
+            notes_pages = [
+                notes_resp,
+                *await self._get_remaining_notes_pages(client, notes_url, notes_resp),
+            ]
+        except httpx.HTTPError as exc:
             logger.error("Failed to fetch MR context: %s", exc)
             return None
 
         try:
-            mr = mr_resp.json()
-            notes = notes_resp.json()
-            changes = changes_resp.json()
+            mr = orjson.loads(mr_resp.content)
+            notes = self._load_notes(notes_pages)
+            changes = orjson.loads(changes_resp.content)
         except ValueError as exc:
             logger.error(
                 "MR context fetch returned non-JSON response for project %s MR %s: %s",
@@ -157,34 +175,85 @@ class IssueContextFetcherStage(Stage):
 
         return self._format_merge_request_markdown(mr, notes, changes)
 
+    @staticmethod
+    async def _get_notes_page(
+        client: httpx.AsyncClient, notes_url: str, page: int
+    ) -> httpx.Response:
+        return await client.get(
+            notes_url, params={"per_page": NOTES_PER_PAGE, "page": page}
+        )
+
+    async def _get_remaining_notes_pages(
+        self, client: httpx.AsyncClient, notes_url: str, first_page: httpx.Response
+    ) -> List[httpx.Response]:
+        """Fetch the notes pages after page 1.
+
+        With X-Total-Pages the rest are fetched concurrently, a few at a time.
+        GitLab omits that header for large collections, so without it the
+        X-Next-Page chain is followed instead.
+        """
+        total_pages = self._page_header(first_page, "X-Total-Pages")
+        if total_pages is None:
+            return await self._follow_next_pages(client, notes_url, first_page)
+        if total_pages <= 1:
+            return []
+
+        semaphore = asyncio.Semaphore(NOTES_PAGE_CONCURRENCY)
+
+        async def get_page(page: int) -> httpx.Response:
+            async with semaphore:
+                response = await self._get_notes_page(client, notes_url, page)
+            response.raise_for_status()
+            return response
+
+        return list(
+            await asyncio.gather(*(get_page(page) for page in range(2, total_pages + 1)))
+        )
+
+    async def _follow_next_pages(
+        self, client: httpx.AsyncClient, notes_url: str, first_page: httpx.Response
+    ) -> List[httpx.Response]:
+        pages: List[httpx.Response] = []
+        current_page = 1
+        next_page = self._page_header(first_page, "X-Next-Page")
+        while next_page is not None and next_page > current_page:
+            response = await self._get_notes_page(client, notes_url, next_page)
+            response.raise_for_status()
+            pages.append(response)
+            current_page = next_page
+            next_page = self._page_header(response, "X-Next-Page")
+        return pages
+
+    @staticmethod
+    def _page_header(response: httpx.Response, name: str) -> Optional[int]:
+        value = (response.headers.get(name) or "").strip()
+        if not value:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            logger.warning("Ignoring malformed %s header: %r", name, value)
+            return None
+
+    @staticmethod
+    def _load_notes(pages: List[httpx.Response]) -> List[Dict[str, object]]:
+        return [note for page in pages for note in orjson.loads(page.content)]
+
     def _format_issue_markdown(
         self, issue: Dict[str, object], notes: List[Dict[str, object]]
     ) -> str:
-        title = str(issue.get("title") or "")
-        state = str(issue.get("state") or "")
-        description = issue.get("description") or "No description provided."
+        return "\n".join(self._iter_issue_lines(issue, notes)).strip() + "\n"
 
-        lines: List[str] = ["# GitLab Issue Context", "", f"Title: {title}"]
+    def _iter_issue_lines(
+        self, issue: Dict[str, object], notes: List[Dict[str, object]]
+    ) -> Iterator[str]:
+        state = issue.get("state")
+        yield "# GitLab Issue Context"
+        yield ""
+        yield f"Title: {issue.get('title') or ''}"
         if state:
-            lines.append(f"State: {state}")
-        lines.extend(["", "## Description", str(description).strip(), "", "## Notes"])
-
-        sorted_notes = sorted(notes, key=lambda note: str(note.get("created_at") or ""))
-        if not sorted_notes:
-            lines.append("No notes found.")
-            return "\n".join(lines).strip() + "\n"
-
-        for note in sorted_notes:
-            author = note.get("author") or {}
-            author_name = str(author.get("name") or "Unknown")
-            created_at = str(note.get("created_at") or "")
-            body = str(note.get("body") or "").strip() or "_No content_"
-            header = f"### {author_name}"
-            if created_at:
-                header = f"{header} ({created_at})"
-            lines.extend(["", header, body])
-
-        return "\n".join(lines).strip() + "\n"
+            yield f"State: {state}"
+        yield from self._iter_description_and_notes(issue, notes)
 
     def _format_merge_request_markdown(
         self,
@@ -192,58 +261,74 @@ class IssueContextFetcherStage(Stage):
         notes: List[Dict[str, object]],
         changes_payload: Dict[str, object],
     ) -> str:
-        title = str(merge_request.get("title") or "")
-        state = str(merge_request.get("state") or "")
-        description = merge_request.get("description") or "No description provided."
-        source_branch = str(merge_request.get("source_branch") or "")
-        target_branch = str(merge_request.get("target_branch") or "")
-        web_url = str(merge_request.get("web_url") or "")
-
-        lines: List[str] = ["# GitLab Merge Request Context", "", f"Title: {title}"]
+        lines = self._iter_merge_request_lines(merge_request, notes, changes_payload)
+        return "\n".join(lines).strip() + "\n"
+
+    def _iter_merge_request_lines(
+        self,
+        merge_request: Dict[str, object],
+        notes: List[Dict[str, object]],
+        changes_payload: Dict[str, object],
+    ) -> Iterator[str]:
+        state = merge_request.get("state")
+        source_branch = merge_request.get("source_branch") or ""
+        target_branch = merge_request.get("target_branch") or ""
+        web_url = merge_request.get("web_url")
+
+        yield "# GitLab Merge Request Context"
+        yield ""
+        yield f"Title: {merge_request.get('title') or ''}"
         if state:
-            lines.append(f"State: {state}")
+            yield f"State: {state}"
         if source_branch or target_branch:
-            lines.append(f"Branches: {source_branch} -> {target_branch}".strip())
+            yield f"Branches: {source_branch} -> {target_branch}".strip()
         if web_url:
-            lines.append(f"URL: {web_url}")
-        lines.extend(
-            ["", "## Description", str(description).strip(), "", "## Notes"]
-        )
+            yield f"URL: {web_url}"
+        yield from self._iter_description_and_notes(merge_request, notes)
 
-        sorted_notes = sorted(notes, key=lambda note: str(note.get("created_at") or ""))
-        if not sorted_notes:
-            lines.append("No notes found.")
-        else:
-            for note in sorted_notes:
-                author = note.get("author") or {}
-                author_name = str(author.get("name") or "Unknown")
-                created_at = str(note.get("created_at") or "")
-                body = str(note.get("body") or "").strip() or "_No content_"
-                header = f"### {author_name}"
-                if created_at:
-                    header = f"{header} ({created_at})"
-                lines.extend(["", header, body])
-
-        lines.extend(["", "## Changes"])
+        yield ""
+        yield "## Changes"
         changes = changes_payload.get("changes") or []
         if not changes:
-            lines.append("No changes returned.")
-            return "\n".join(lines).strip() + "\n"
+            yield "No changes returned."
+            return
 
         for change in changes:
-            old_path = str(change.get("old_path") or "")
-            new_path = str(change.get("new_path") or "")
-            diff = str(change.get("diff") or "").strip()
-            lines.extend(
-                [
-                    "",
-                    f"### {new_path or old_path or 'unknown file'}",
-                    f"- old_path: {old_path or '_unknown_'}",
-                    f"- new_path: {new_path or '_unknown_'}",
-                    "```diff",
-                    diff or "# no diff returned",
-                    "```",
-                ]
-            )
+            old_path = change.get("old_path") or ""
+            new_path = change.get("new_path") or ""
+            diff = (change.get("diff") or "").strip()
+            yield ""
+            yield f"### {new_path or old_path or 'unknown file'}"
+            yield f"- old_path: {old_path or '_unknown_'}"
+            yield f"- new_path: {new_path or '_unknown_'}"
+            yield "```diff"
+            yield diff or "# no diff returned"
+            yield "```"
+
+    @staticmethod
+    def _iter_description_and_notes(
+        noteable: Dict[str, object], notes: List[Dict[str, object]]
+    ) -> Iterator[str]:
+        yield ""
+        yield "## Description"
+        yield (noteable.get("description") or "No description provided.").strip()
+        yield ""
+        yield "## Notes"
+
+        if not notes:
+            yield "No notes found."
+            return
+
+        for note in sorted(notes, key=_created_at):
+            created_at = note.get("created_at")
+            author_name = (note.get("author") or {}).get("name") or "Unknown"
+            yield ""
+            if created_at:
+                yield f"### {author_name} ({created_at})"
+            else:
+                yield f"### {author_name}"
+            yield (note.get("body") or "").strip() or "_No content_"
 
-        return "\n".join(lines).strip() + "\n"
+
+def _created_at(note: Dict[str, object]) -> str:
+    return note.get("created_at") or ""
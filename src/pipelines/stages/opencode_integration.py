@@ -1,10 +1,13 @@
-import json
+import asyncio
 import logging
 import os
-import subprocess
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import IO, List, Optional
 
+import orjson
+
+from src.config import OPENCODE_MAX_CONCURRENT_RUNS
 from src.opencode_command import opencode_command_args
 
 from ..base import AgentResult, PipelineContext, Stage, StageResult
@@ -17,6 +20,43 @@ from .preparation_support import (
 logger = logging.getLogger(__name__)
 REPO_ROOT = Path(__file__).resolve().parents[3]
 OPENCODE_CONFIG_PATH = REPO_ROOT / "opencode.json"
+TEXT_EVENT_MARKER = b'"text"'
+# asyncio caps a single stdout line at 64 KiB by default; one text event can
+# carry a whole long answer.
+OPENCODE_LINE_LIMIT = 16 * 1024 * 1024
+# Pipelines run as independent tasks, so this is what bounds how many opencode
+# processes a burst of note hooks can start.
+_opencode_slots = asyncio.Semaphore(OPENCODE_MAX_CONCURRENT_RUNS)
+EVENTS_FILENAME = "opencode_events.jsonl"
+REPLY_FILENAME = "opencode_reply.md"
+
+
+def _relative_to_repo(path: str, repo_dir: str) -> str:
+    """Return ``path`` relative to ``repo_dir``, slicing when it is already inside."""
+    prefix = repo_dir.rstrip(os.sep) + os.sep
+    if path.startswith(prefix):
+        return path[len(prefix) :]
+    return os.path.relpath(path, repo_dir)
+
+
+def _write_text(path: str, text: str) -> None:
+    """Write ``text`` with raw ``os.write`` calls, bypassing the buffered text layer."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        data = memoryview(text.encode("utf-8"))
+        while data:
+            data = data[os.write(fd, data) :]
+    finally:
+        os.close(fd)
+
+
+@dataclass
+class OpencodeRun:
+    """Outcome of one streamed opencode invocation."""
+
+    returncode: int
+    text: str
+    stderr: str
 
 
 class BaseOpencodeStage(Stage):
@@ -35,7 +75,13 @@ class BaseOpencodeStage(Stage):
     def _extract_question(self, context: PipelineContext) -> str:
         note_body = context.metadata.get("note_body", "")
         trigger = context.metadata.get("trigger_pattern", "")
-        question = note_body.replace(trigger, "").strip()
+        # Only the invoking trigger is dropped, so a question that mentions the
+        # trigger again keeps it; commands lead the note, mentions may not.
+        stripped = note_body.lstrip()
+        if stripped.startswith(trigger):
+            question = stripped.removeprefix(trigger).strip()
+        else:
+            question = note_body.replace(trigger, "", 1).strip()
         return question or "No additional question provided."
 
     def _format_noteable_type(self, noteable_type: str) -> str:
@@ -49,7 +95,7 @@ class BaseOpencodeStage(Stage):
     ) -> None:
         thread_context_path = context.metadata.get("thread_context_path")
         if thread_context_path:
-            relative_path = os.path.relpath(thread_context_path, repo_dir)
+            relative_path = _relative_to_repo(thread_context_path, repo_dir)
             prompt.append(f"Use the thread context in {relative_path}.")
 
         snapshot = context.code_snapshot or {}
@@ -63,13 +109,22 @@ class BaseOpencodeStage(Stage):
         if merge_request_state:
             prompt.append(f"Merge request state: {merge_request_state}.")
 
-    def _run_opencode(self, repo_dir: str, prompt: str) -> subprocess.CompletedProcess:
+    async def _run_opencode(
+        self, repo_dir: str, prompt: str, events_path: str
+    ) -> OpencodeRun:
+        """Run opencode in a free slot, copying its JSON events to ``events_path`` as they arrive."""
+        async with _opencode_slots:
+            return await self._run_opencode_process(repo_dir, prompt, events_path)
+
+    async def _run_opencode_process(
+        self, repo_dir: str, prompt: str, events_path: str
+    ) -> OpencodeRun:
         env = os.environ.copy()
         if OPENCODE_CONFIG_PATH.exists():
             env.setdefault("OPENCODE_CONFIG", str(OPENCODE_CONFIG_PATH))
 
-        return subprocess.run(
-            opencode_command_args(
+        proc = await asyncio.create_subprocess_exec(
+            *opencode_command_args(
                 "run",
                 "--format",
                 "json",
@@ -80,28 +135,55 @@ class BaseOpencodeStage(Stage):
                 prompt,
             ),
             cwd=repo_dir,
-            check=False,
-            capture_output=True,
-            text=True,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
             env=env,
+            limit=OPENCODE_LINE_LIMIT,
         )
-
-    def _extract_text_events(self, lines: List[str]) -> str:
         chunks: List[str] = []
-        for line in lines:
-            trimmed = line.strip()
-            if not trimmed:
-                continue
-            try:
-                event = json.loads(trimmed)
-            except json.JSONDecodeError:
-                continue
-            if event.get("type") == "text":
-                part = event.get("part", {})
-                text = part.get("text")
-                if text:
-                    chunks.append(text)
-        return "".join(chunks).strip()
+        try:
+            with open(events_path, "wb") as events:
+                # Both pipes are drained together so neither can fill up and
+                # stall the child.
+                _, stderr = await asyncio.gather(
+                    self._consume_events(proc.stdout, events, chunks),
+                    proc.stderr.read(),
+                )
+            await proc.wait()
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+
+        return OpencodeRun(
+            returncode=proc.returncode,
+            text="".join(chunks).strip(),
+            stderr=stderr.decode("utf-8", errors="replace"),
+        )
+
+    async def _consume_events(
+        self, stdout: asyncio.StreamReader, events: IO[bytes], chunks: List[str]
+    ) -> None:
+        async for line in stdout:
+            events.write(line)
+            text = self._parse_text_event(line)
+            if text:
+                chunks.append(text)
+
+    @staticmethod
+    def _parse_text_event(line: bytes) -> Optional[str]:
+        # Most events are tool and step updates; a text event must mention the
+        # "text" token, so anything without it is skipped before decoding. The
+        # token is matched without the "type": prefix to stay whitespace-agnostic.
+        if TEXT_EVENT_MARKER not in line:
+            return None
+        try:
+            event = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            return None
+        if not isinstance(event, dict) or event.get("type") != "text":
+            return None
+        return event.get("part", {}).get("text")
 
 
 class OpencodePreparationStage(BaseOpencodeStage):
@@ -116,7 +198,7 @@ class OpencodePreparationStage(BaseOpencodeStage):
         super().__init__(model=model, agent=agent or "gitlab-prepare")
         self.enabled = enabled
 
-    def _execute(self, context: PipelineContext) -> StageResult:
+    async def _execute(self, context: PipelineContext) -> StageResult:
         if not self.enabled:
             return StageResult(context=context, should_stop=False)
 
@@ -126,13 +208,8 @@ class OpencodePreparationStage(BaseOpencodeStage):
         events_path = ensure_prep_events_path(context, repo_dir)
 
         try:
-            result = self._run_opencode(repo_dir, prompt)
-            with open(events_path, "w", encoding="utf-8") as handle:
-                handle.write(result.stdout)
-
-            content = self._extract_text_events(result.stdout.splitlines())
-            if not content:
-                content = "No preparation summary generated."
+            result = await self._run_opencode(repo_dir, prompt, events_path)
+            content = result.text or "No preparation summary generated."
 
             status = "success" if result.returncode == 0 else "failed"
             body = "\n".join(
@@ -196,33 +273,28 @@ class OpencodePreparationStage(BaseOpencodeStage):
 class OpencodeIntegrationStage(BaseOpencodeStage):
     """Run opencode with JSON output and capture reply."""
 
-    def _execute(self, context: PipelineContext) -> StageResult:
+    async def _execute(self, context: PipelineContext) -> StageResult:
         self._validate_review_inputs(context)
         repo_dir = self._require_repo_dir(context)
 
         question = self._extract_question(context)
         prompt = self._build_prompt(context, repo_dir, question)
-        result = self._run_opencode(repo_dir, prompt)
+        events_path = os.path.join(repo_dir, EVENTS_FILENAME)
+        reply_path = os.path.join(repo_dir, REPLY_FILENAME)
+
+        result = await self._run_opencode(repo_dir, prompt, events_path)
 
         if result.returncode != 0:
             error_msg = result.stderr.strip() or "Unknown opencode error"
             raise RuntimeError(f"opencode run failed: {error_msg}")
 
-        events_path = os.path.join(repo_dir, "opencode_events.jsonl")
-        reply_path = os.path.join(repo_dir, "opencode_reply.md")
-
-        with open(events_path, "w", encoding="utf-8") as handle:
-            handle.write(result.stdout)
-
-        content = self._extract_text_events(result.stdout.splitlines())
-        if not content:
-            content = "No response generated."
+        # OpencodeRun.text is already stripped.
+        content = result.text or "No response generated."
 
-        with open(reply_path, "w", encoding="utf-8") as handle:
-            handle.write(content.strip() + "\n")
+        _write_text(reply_path, content + "\n")
 
         context.agent_result = AgentResult(
-            content=content.strip(),
+            content=content,
             format="markdown",
             metadata={
                 "agent_type": self.agent,
@@ -269,7 +341,7 @@ class OpencodeIntegrationStage(BaseOpencodeStage):
 
         prep_report_path = context.metadata.get("prep_report_path")
         if prep_report_path:
-            relative_path = os.path.relpath(prep_report_path, repo_dir)
+            relative_path = _relative_to_repo(prep_report_path, repo_dir)
             prompt.append(f"Review the preparation report in {relative_path} before answering.")
 
         prompt.append(
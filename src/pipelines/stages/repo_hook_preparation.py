@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 import subprocess
@@ -16,7 +17,7 @@ class RepoHookPreparationStage(Stage):
         self.enabled = enabled
         self.script_name = script_name
 
-    def _execute(self, context: PipelineContext) -> StageResult:
+    async def _execute(self, context: PipelineContext) -> StageResult:
         if not self.enabled:
             return StageResult(context=context, should_stop=False)
 
@@ -31,7 +32,8 @@ class RepoHookPreparationStage(Stage):
 
         started_at = time.monotonic()
         try:
-            result = subprocess.run(
+            result = await asyncio.to_thread(
+                subprocess.run,
                 ["bash", self.script_name],
                 cwd=repo_dir,
                 check=False,
@@ -1,19 +1,30 @@
 from ..base import Stage, StageResult, PipelineContext
 import logging
+from types import MappingProxyType
+from typing import Any, Mapping
 
 logger = logging.getLogger(__name__)
 
+# Shared stand-in for missing payload sections, so misses allocate nothing.
+_EMPTY = MappingProxyType({})
+
 
 class SnapshotResolverStage(Stage):
     """Stage B: Resolve code snapshot (SHA/branch)"""
 
     @staticmethod
-    def _resolve_merge_request_sha(mr: dict) -> str | None:
-        diff_refs = mr.get("diff_refs") or {}
-        last_commit = mr.get("last_commit") or {}
-
+    def _resolve_merge_request_sha(mr: Mapping[str, Any]) -> str | None:
+        # diff_refs.head_sha is present on almost every MR note, so it is read
+        # by subscript and the fallbacks are only looked at when it is missing.
+        try:
+            head_sha = mr["diff_refs"]["head_sha"]
+        except (KeyError, TypeError):
+            head_sha = None
+        if head_sha:
+            return str(head_sha)
+
+        last_commit = mr.get("last_commit") or _EMPTY
         for candidate in (
-            diff_refs.get("head_sha"),
             mr.get("sha"),
             last_commit.get("id"),
             mr.get("squash_commit_sha"),
@@ -23,28 +34,28 @@ class SnapshotResolverStage(Stage):
                 return str(candidate)
         return None
 
-    def _execute(self, context: PipelineContext) -> StageResult:
+    async def _execute(self, context: PipelineContext) -> StageResult:
         payload = context.webhook_payload
         noteable_type = context.metadata.get("noteable_type")
-        project = payload.get("project", {})
-
-        snapshot = {}
+        project = context.project_info
 
         if noteable_type == "MergeRequest":
-            mr = payload.get("merge_request", {})
-            snapshot["sha"] = self._resolve_merge_request_sha(mr)
-            snapshot["source_branch"] = mr.get("source_branch")
-            snapshot["target_branch"] = mr.get("target_branch")
-            snapshot["merge_request_iid"] = mr.get("iid")
-            snapshot["merge_request_state"] = mr.get("state")
-            snapshot["branch"] = snapshot["source_branch"] or project.get(
-                "default_branch"
-            )
+            mr = payload.get("merge_request") or _EMPTY
+            source_branch = mr.get("source_branch")
+            snapshot = {
+                "sha": self._resolve_merge_request_sha(mr),
+                "source_branch": source_branch,
+                "target_branch": mr.get("target_branch"),
+                "merge_request_iid": mr.get("iid"),
+                "merge_request_state": mr.get("state"),
+                "branch": source_branch or project.get("default_branch"),
+            }
         elif noteable_type == "Issue":
-            snapshot["sha"] = None
-            snapshot["branch"] = project.get("default_branch") or "main"
+            snapshot = {"sha": None, "branch": project.get("default_branch") or "main"}
+        else:
+            snapshot = {}
 
         context.code_snapshot = snapshot
-        logger.info(f"Resolved code snapshot: {snapshot}")
+        logger.info("Resolved code snapshot: %s", snapshot)
 
         return StageResult(context=context, should_stop=False)
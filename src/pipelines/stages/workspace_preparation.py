@@ -9,9 +9,9 @@ class WorkspacePreparationStage(Stage):
     def __init__(self, preparation_config: PreparationConfig | None = None):
         self.preparation_config = preparation_config or PreparationConfig()
 
-    def _execute(self, context: PipelineContext) -> StageResult:
+    async def _execute(self, context: PipelineContext) -> StageResult:
         for stage in self._build_route_stages():
-            result = stage.execute(context)
+            result = await stage.execute(context)
             context = result.context
             if result.should_stop:
                 return result
@@ -0,0 +1,49 @@
+"""Typed view of the webhook fields used to route an event.
+
+Only the handful of fields the webhook gates on are declared; msgspec skips
+everything else in the body while decoding, so ignored events never build
+the full payload dict.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import msgspec
+
+
+class EventUser(msgspec.Struct):
+    username: Optional[str] = None
+    name: Optional[str] = None
+
+
+class EventProject(msgspec.Struct):
+    id: Optional[int] = None
+    path_with_namespace: Optional[str] = None
+    web_url: Optional[str] = None
+
+
+class EventAttributes(msgspec.Struct):
+    id: Optional[int] = None
+    note: Optional[str] = None
+    noteable_type: Optional[str] = None
+
+
+class WebhookEvent(msgspec.Struct):
+    object_kind: Optional[str] = None
+    user: EventUser = msgspec.field(default_factory=EventUser)
+    project: EventProject = msgspec.field(default_factory=EventProject)
+    object_attributes: EventAttributes = msgspec.field(default_factory=EventAttributes)
+
+
+_event_decoder = msgspec.json.Decoder(WebhookEvent)
+_payload_decoder = msgspec.json.Decoder(dict)
+
+
+def decode_webhook_event(body: bytes) -> WebhookEvent:
+    return _event_decoder.decode(body)
+
+
+def decode_webhook_payload(body: bytes) -> dict:
+    """Decode the full payload handed to pipelines and note replies."""
+    return _payload_decoder.decode(body)
@@ -1,9 +1,13 @@
+import asyncio
+import json
 import logging
+from logging.handlers import QueueHandler
 
 from fastapi.responses import JSONResponse
 from fastapi.testclient import TestClient
 
 import app
+from src.pipelines.base import StageResult
 
 
 client = TestClient(app.app)
@@ -16,6 +20,17 @@ def test_health_includes_gitlab_user():
     assert "gitlab_user" in response.json()
 
 
+def test_lifespan_routes_root_logging_through_queue_listener():
+    root = logging.getLogger()
+    original_handlers = list(root.handlers)
+
+    with TestClient(app.app) as lifespan_client:
+        assert lifespan_client.get("/health").status_code == 200
+        assert [type(handler) for handler in root.handlers] == [QueueHandler]
+
+    assert root.handlers == original_handlers
+
+
 def test_webhook_routes_mr_mention_to_review_pipeline(monkeypatch):
     payload = {
         "object_kind": "note",
@@ -39,12 +54,14 @@ def test_webhook_routes_mr_mention_to_review_pipeline(monkeypatch):
         command,
         trigger_text=None,
         display_trigger=None,
+        pipeline=None,
     ):
         captured["payload"] = payload_arg
         captured["command_name"] = command_name
         captured["command"] = command
         captured["trigger_text"] = trigger_text
         captured["display_trigger"] = display_trigger
+        captured["pipeline"] = pipeline
         return JSONResponse({"status": "completed", "command": command_name})
 
     monkeypatch.setattr(app, "_run_detected_command", fake_run_detected_command)
@@ -57,6 +74,7 @@ def test_webhook_routes_mr_mention_to_review_pipeline(monkeypatch):
     assert captured["command_name"] == "oc_review"
     assert captured["trigger_text"] == "@nid-bugbard"
     assert captured["display_trigger"] == "/oc_review"
+    assert captured["pipeline"].name == "oc_review"
 
 
 def test_webhook_replies_to_issue_mention(monkeypatch):
@@ -76,7 +94,7 @@ def test_webhook_replies_to_issue_mention(monkeypatch):
 
     captured = {}
 
-    def fake_post(project_id, noteable_type, noteable_iid, body, project=None):
+    async def fake_post(project_id, noteable_type, noteable_iid, body, project=None):
         captured["project_id"] = project_id
         captured["noteable_type"] = noteable_type
         captured["noteable_iid"] = noteable_iid
@@ -117,6 +135,22 @@ def test_webhook_ignores_self_authored_note(monkeypatch):
     assert response.json() == {"status": "ignored", "reason": "self_note"}
 
 
+def test_webhook_ignores_non_note_events_by_header(monkeypatch):
+    def fail_decode(body):
+        raise AssertionError("body should not be decoded")
+
+    monkeypatch.setattr(app, "decode_webhook_event", fail_decode)
+
+    response = client.post(
+        "/webhook",
+        content=b"not json",
+        headers={"X-Gitlab-Event": "Pipeline Hook"},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ignored"}
+
+
 def test_webhook_logs_received_note_without_trigger(monkeypatch, caplog):
     payload = {
         "object_kind": "note",
@@ -138,3 +172,41 @@ def test_webhook_logs_received_note_without_trigger(monkeypatch, caplog):
     assert response.json() == {"status": "ignored"}
     assert "GitLab webhook received" in caplog.text
     assert "Ignoring webhook note: no supported trigger" in caplog.text
+
+
+def test_run_detected_command_schedules_pipeline_in_background():
+    started = asyncio.Event()
+    release = asyncio.Event()
+    executed = []
+
+    class FakePipeline:
+        name = "oc_test"
+
+        async def execute(self, context):
+            started.set()
+            await release.wait()
+            executed.append(context)
+            return StageResult(context=context)
+
+    class FakeCommand:
+        trigger_pattern = "/oc_test"
+
+        def get_pipeline(self):
+            return FakePipeline()
+
+    payload = {"object_kind": "note", "object_attributes": {"note": "/oc_test"}}
+
+    async def scenario():
+        response = await app._run_detected_command(payload, "oc_test", FakeCommand())
+        assert json.loads(response.body) == {"status": "accepted", "command": "oc_test"}
+        assert not executed
+
+        await started.wait()
+        release.set()
+        await asyncio.gather(*app._pipeline_tasks)
+
+    asyncio.run(scenario())
+
+    assert len(executed) == 1
+    assert executed[0].webhook_payload == payload
+    assert not app._pipeline_tasks
@@ -1,8 +1,16 @@
-from src.gitlab_api import normalize_gitlab_url
+import asyncio
+import json
+
+import httpx
+
+import src.gitlab_api as gitlab_api
+
+from src.config import normalize_base_url
+from src.gitlab_api import extract_noteable_iid, normalize_gitlab_url, post_gitlab_note
 
 
 def test_normalize_gitlab_url_uses_project_web_url_for_project_scoped_env(monkeypatch):
-    monkeypatch.setenv("GITLAB_URL", "https://gitlab.example.com/group/repo")
+    monkeypatch.setattr("src.gitlab_api.GITLAB_BASE", "https://gitlab.example.com/group/repo")
 
     project = {
         "web_url": "https://gitlab.example.com/group/repo",
@@ -13,7 +21,7 @@ def test_normalize_gitlab_url_uses_project_web_url_for_project_scoped_env(monkey
 
 
 def test_normalize_gitlab_url_preserves_relative_root_from_project_metadata(monkeypatch):
-    monkeypatch.setenv("GITLAB_URL", "https://gitlab.example.com/group/repo")
+    monkeypatch.setattr("src.gitlab_api.GITLAB_BASE", "https://gitlab.example.com/group/repo")
 
     project = {
         "web_url": "https://gitlab.example.com/gitlab/group/repo",
@@ -21,3 +29,87 @@ def test_normalize_gitlab_url_preserves_relative_root_from_project_metadata(monk
     }
 
     assert normalize_gitlab_url(project=project) == "https://gitlab.example.com/gitlab"
+
+
+def test_post_gitlab_note_uses_shared_client(monkeypatch):
+    captured = {}
+
+    class FakeResponse:
+        text = ""
+        content = b'{"id": 5}'
+
+        def raise_for_status(self):
+            return None
+
+    class FakeClient:
+        async def post(self, url, headers, content):
+            captured["url"] = url
+            captured["headers"] = headers
+            captured["content"] = content
+            return FakeResponse()
+
+    monkeypatch.setattr("src.gitlab_api.GITLAB_PAT", "test-token")
+    monkeypatch.setattr("src.gitlab_api.get_gitlab_client", lambda: FakeClient())
+
+    project = {
+        "web_url": "https://gitlab.example.com/group/repo",
+        "path_with_namespace": "group/repo",
+    }
+    response = asyncio.run(post_gitlab_note(7, "Issue", 3, "hello", project=project))
+
+    assert response == {"id": 5}
+    assert captured["url"] == "https://gitlab.example.com/api/v4/projects/7/issues/3/notes"
+    assert captured["headers"] == {"Content-Type": "application/json"}
+    assert json.loads(captured["content"]) == {"body": "hello"}
+
+
+def test_normalize_base_url_strips_project_and_api_paths():
+    assert normalize_base_url("https://gitlab.example.com/") == "https://gitlab.example.com"
+    assert (
+        normalize_base_url("https://gitlab.example.com/gitlab/api/v4/projects")
+        == "https://gitlab.example.com/gitlab"
+    )
+    assert (
+        normalize_base_url("https://gitlab.example.com/group/repo/-/issues/3")
+        == "https://gitlab.example.com/group/repo"
+    )
+
+
+def test_gitlab_client_sends_token_on_every_request(monkeypatch):
+    monkeypatch.setattr(gitlab_api, "HEADERS", {"PRIVATE-TOKEN": "test-token"})
+    monkeypatch.setattr(gitlab_api, "_client", None)
+
+    client = gitlab_api.get_gitlab_client()
+    try:
+        request = client.build_request("GET", "https://gitlab.example.com/api/v4/projects")
+        assert request.headers["PRIVATE-TOKEN"] == "test-token"
+        assert "gzip" in request.headers["Accept-Encoding"]
+    finally:
+        asyncio.run(gitlab_api.close_gitlab_client())
+
+
+def test_gitlab_client_honors_environment_proxies(monkeypatch):
+    monkeypatch.setenv("HTTPS_PROXY", "http://proxy.example.com:3128")
+    monkeypatch.setenv("NO_PROXY", "internal.example.com")
+    monkeypatch.setattr(gitlab_api, "_client", None)
+
+    client = gitlab_api.get_gitlab_client()
+    try:
+        proxied = client._transport_for_url(httpx.URL("https://gitlab.example.com/api/v4"))
+        direct = client._transport_for_url(httpx.URL("https://internal.example.com/api/v4"))
+        assert proxied is not client._transport
+        assert direct is client._transport
+    finally:
+        asyncio.run(gitlab_api.close_gitlab_client())
+
+
+def test_extract_noteable_iid_uses_known_noteable_type():
+    payload = {
+        "object_attributes": {"noteable_type": "Issue", "noteable_id": 900},
+        "merge_request": {"iid": 42},
+        "issue": {"iid": 7},
+    }
+
+    assert extract_noteable_iid(payload) == 7
+    assert extract_noteable_iid(payload, "MergeRequest") == 42
+    assert extract_noteable_iid({"object_attributes": {"noteable_iid": 3}}, "Issue") == 3
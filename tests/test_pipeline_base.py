@@ -1,3 +1,4 @@
+import asyncio
 from pathlib import Path
 
 import pytest
@@ -5,7 +6,7 @@ from src.pipelines.base import Pipeline, Stage, StageResult, PipelineContext
 
 
 class MockStage(Stage):
-    def _execute(self, context: PipelineContext) -> StageResult:
+    async def _execute(self, context: PipelineContext) -> StageResult:
         context.metadata["executed"] = True
         return StageResult(context=context, should_stop=False)
 
@@ -15,7 +16,7 @@ def test_pipeline_execution():
     stages = [MockStage(), MockStage()]
     pipeline = Pipeline(name="test", stages=stages)
 
-    result = pipeline.execute(context)
+    result = asyncio.run(pipeline.execute(context))
 
     assert result.success
     assert context.metadata["executed"]
@@ -23,14 +24,14 @@ def test_pipeline_execution():
 
 def test_pipeline_stop_on_error():
     class ErrorStage(Stage):
-        def _execute(self, context: PipelineContext) -> StageResult:
+        async def _execute(self, context: PipelineContext) -> StageResult:
             raise ValueError("Test error")
 
     context = PipelineContext(webhook_payload={})
     stages = [MockStage(), ErrorStage(), MockStage()]
     pipeline = Pipeline(name="test", stages=stages)
 
-    result = pipeline.execute(context)
+    result = asyncio.run(pipeline.execute(context))
 
     assert not result.success
     assert result.error is not None
@@ -38,14 +39,14 @@ def test_pipeline_stop_on_error():
 
 def test_pipeline_should_stop():
     class StopStage(Stage):
-        def _execute(self, context: PipelineContext) -> StageResult:
+        async def _execute(self, context: PipelineContext) -> StageResult:
             return StageResult(context=context, should_stop=True)
 
     context = PipelineContext(webhook_payload={})
     stages = [MockStage(), StopStage(), MockStage()]
     pipeline = Pipeline(name="test", stages=stages)
 
-    result = pipeline.execute(context)
+    result = asyncio.run(pipeline.execute(context))
 
     assert result.success
     assert context.metadata.get("final_executed") is None
@@ -63,7 +64,7 @@ def test_pipeline_cleans_up_workspace_when_requested(tmp_path):
     )
     pipeline = Pipeline(name="test", stages=[MockStage()])
 
-    result = pipeline.execute(context)
+    result = asyncio.run(pipeline.execute(context))
 
     assert result.success
     assert not Path(context.local_context_path).exists()
@@ -80,7 +81,61 @@ def test_pipeline_keeps_workspace_when_cleanup_not_requested(tmp_path):
     )
     pipeline = Pipeline(name="test", stages=[MockStage()])
 
-    result = pipeline.execute(context)
+    result = asyncio.run(pipeline.execute(context))
 
     assert result.success
     assert Path(context.local_context_path).exists()
+
+
+def test_pipeline_removes_cached_worktree(monkeypatch, tmp_path):
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    removed = []
+
+    class FakeRepoCache:
+        async def remove_worktree(self, mirror, repo_dir):
+            removed.append((mirror, repo_dir))
+
+    monkeypatch.setattr("src.pipelines.repo_cache.get_repo_cache", lambda: FakeRepoCache())
+
+    context = PipelineContext(
+        webhook_payload={},
+        local_context_path=str(workspace),
+        workspace_cleanup_required=True,
+        workspace_mirror_path="/cache/7.git",
+    )
+    pipeline = Pipeline(name="test", stages=[MockStage()])
+
+    result = asyncio.run(pipeline.execute(context))
+
+    assert result.success
+    assert removed == [("/cache/7.git", str(workspace))]
+    assert not workspace.exists()
+
+
+def test_pipeline_context_resolves_identifiers_from_payload():
+    payload = {
+        "project": {"id": 3, "web_url": "https://gitlab.example.com/g/r"},
+        "object_attributes": {"noteable_type": "Issue"},
+        "issue": {"iid": 12},
+    }
+
+    context = PipelineContext(webhook_payload=payload)
+
+    assert context.project_info is payload["project"]
+    assert context.project_id == 3
+    assert context.noteable_iid == 12
+
+
+def test_pipeline_context_resolves_iid_with_known_noteable_type():
+    payload = {
+        "object_attributes": {"noteable_type": "Issue"},
+        "merge_request": {"iid": 42},
+        "issue": {"iid": 12},
+    }
+
+    context = PipelineContext(
+        webhook_payload=payload, metadata={"noteable_type": "MergeRequest"}
+    )
+
+    assert context.noteable_iid == 42
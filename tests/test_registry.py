@@ -1,4 +1,8 @@
-from src.pipelines.registry import contains_user_mention, detect_command
+from src.pipelines.registry import (
+    contains_user_mention,
+    detect_command,
+    get_pipeline_for_command,
+)
 
 
 def test_detect_command_returns_matching_command():
@@ -26,3 +30,20 @@ def test_contains_user_mention_matches_exact_username():
     assert contains_user_mention("please check this @nid-bugbard", "nid-bugbard")
     assert not contains_user_mention("@nid-bugbard-extra should not match", "nid-bugbard")
     assert not contains_user_mention("plain text only", "nid-bugbard")
+
+
+def test_get_pipeline_for_command_reuses_pipeline():
+    pipeline = get_pipeline_for_command("oc_review")
+
+    assert pipeline is not None
+    assert pipeline.name == "oc_review"
+    assert get_pipeline_for_command("oc_review") is pipeline
+    assert get_pipeline_for_command("unknown") is None
+
+
+def test_detect_command_returns_first_trigger_in_text():
+    command = detect_command("/oc_ask first, then maybe /oc_review")
+
+    assert command is not None
+    assert command.name == "oc_ask"
+    assert detect_command("no trigger here") is None
@@ -0,0 +1,35 @@
+import asyncio
+
+
+def fake_subprocess_exec(captured=None, stdout="", stderr="", returncode=0):
+    """Build an asyncio.create_subprocess_exec stand-in that replays canned opencode output."""
+    captured = {} if captured is None else captured
+
+    class FakeProcess:
+        def __init__(self):
+            self.stdout = _stream(stdout)
+            self.stderr = _stream(stderr)
+            self.returncode = None
+
+        async def wait(self):
+            self.returncode = returncode
+            return self.returncode
+
+        def kill(self):
+            self.returncode = -9
+
+    async def create_subprocess_exec(*args, cwd=None, stdout=None, stderr=None, env=None, limit=None):
+        captured["args"] = list(args)
+        captured["cwd"] = cwd
+        captured["env"] = env
+        captured["prompt"] = args[-1]
+        return FakeProcess()
+
+    return create_subprocess_exec
+
+
+def _stream(text):
+    reader = asyncio.StreamReader()
+    reader.feed_data(text.encode("utf-8"))
+    reader.feed_eof()
+    return reader
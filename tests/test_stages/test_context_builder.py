@@ -1,8 +1,12 @@
+import asyncio
 import pytest
 import subprocess
 from unittest.mock import patch, MagicMock
 from src.pipelines.stages.context_builder import ContextBuilderStage, WorkspaceAcquisitionStage
 from src.pipelines.base import PipelineContext, WorkspaceConfig
+from src.pipelines.repo_cache import RepoCache
+
+RUN_GIT = "src.pipelines.stages.context_builder.run_git"
 
 
 def test_workspace_acquisition_creates_temp_dir_and_sets_cleanup():
@@ -14,9 +18,9 @@ def test_workspace_acquisition_creates_temp_dir_and_sets_cleanup():
     context.code_snapshot = {"branch": "main"}
     stage = WorkspaceAcquisitionStage()
 
-    with patch("subprocess.run") as mock_run:
+    with patch(RUN_GIT) as mock_run:
         mock_run.return_value = MagicMock()
-        result = stage.execute(context)
+        result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert context.local_context_path is not None
@@ -34,9 +38,9 @@ def test_context_builder_alias_still_works():
     context.code_snapshot = {"branch": "main"}
     stage = ContextBuilderStage()
 
-    with patch("subprocess.run") as mock_run:
+    with patch(RUN_GIT) as mock_run:
         mock_run.return_value = MagicMock()
-        result = stage.execute(context)
+        result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert context.local_context_path is not None
@@ -48,7 +52,7 @@ def test_workspace_acquisition_no_git_url():
     context.code_snapshot = {"branch": "main"}
     stage = WorkspaceAcquisitionStage()
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert result.should_stop
     assert result.error is not None
@@ -63,8 +67,8 @@ def test_workspace_acquisition_stops_on_clone_failure():
     context.code_snapshot = {"branch": "main"}
     stage = WorkspaceAcquisitionStage()
 
-    with patch("subprocess.run", side_effect=RuntimeError("clone failed")):
-        result = stage.execute(context)
+    with patch(RUN_GIT, side_effect=RuntimeError("clone failed")):
+        result = asyncio.run(stage.execute(context))
 
     assert result.should_stop
     assert str(result.error) == "clone failed"
@@ -81,9 +85,9 @@ def test_workspace_acquisition_supports_config_object():
         workspace_config=WorkspaceConfig(mode="fresh_clone", cleanup_required=False)
     )
 
-    with patch("subprocess.run") as mock_run:
+    with patch(RUN_GIT) as mock_run:
         mock_run.return_value = MagicMock()
-        result = stage.execute(context)
+        result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert context.workspace_cleanup_required is False
@@ -99,23 +103,18 @@ def test_workspace_acquisition_fetches_merge_request_ref_when_branch_missing():
     stage = WorkspaceAcquisitionStage()
 
     def run_side_effect(args, **kwargs):
-        if args[:2] == ["git", "checkout"] and args[2] == "prod_pure":
-            raise subprocess.CalledProcessError(1, args, stderr=b"pathspec failed")
+        if args[:2] == ["git", "clone"] and "prod_pure" in args:
+            raise subprocess.CalledProcessError(1, args, stderr=b"branch not found")
         return MagicMock()
 
-    with patch("subprocess.run", side_effect=run_side_effect) as mock_run:
-        result = stage.execute(context)
+    with patch(RUN_GIT, side_effect=run_side_effect) as mock_run:
+        result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     commands = [call.args[0] for call in mock_run.call_args_list]
-    assert ["git", "checkout", "prod_pure"] in commands
-    assert [
-        "git",
-        "fetch",
-        "origin",
-        "refs/merge-requests/76/head:refs/heads/mr-76",
-    ] in commands
-    assert ["git", "checkout", "mr-76"] in commands
+    assert commands[0][:6] == ["git", "clone", "--depth", "1", "--branch", "prod_pure"]
+    assert commands[-2][-2:] == ["origin", "refs/merge-requests/76/head"]
+    assert commands[-1] == ["git", "checkout", "--quiet", "FETCH_HEAD"]
 
 
 def test_workspace_acquisition_reports_missing_merge_request_ref():
@@ -128,14 +127,122 @@ def test_workspace_acquisition_reports_missing_merge_request_ref():
     stage = WorkspaceAcquisitionStage()
 
     def run_side_effect(args, **kwargs):
-        if args[:2] == ["git", "checkout"] and args[2] == "prod_pure":
-            raise subprocess.CalledProcessError(1, args, stderr=b"pathspec failed")
-        if args[:2] == ["git", "fetch"]:
+        if args[:2] == ["git", "clone"] and "prod_pure" in args:
+            raise subprocess.CalledProcessError(1, args, stderr=b"branch not found")
+        if "fetch" in args:
             raise subprocess.CalledProcessError(1, args, stderr=b"ref missing")
         return MagicMock()
 
-    with patch("subprocess.run", side_effect=run_side_effect):
-        result = stage.execute(context)
+    with patch(RUN_GIT, side_effect=run_side_effect):
+        result = asyncio.run(stage.execute(context))
 
     assert result.should_stop
     assert "merge request ref !76 is no longer available" in str(result.error)
+
+
+def test_workspace_acquisition_fetches_single_revision_for_sha():
+    payload = {
+        "object_kind": "note",
+        "project": {"git_http_url": "https://gitlab.com/test/repo.git"},
+    }
+    context = PipelineContext(webhook_payload=payload)
+    context.code_snapshot = {"sha": "abc123", "branch": "feature"}
+    stage = WorkspaceAcquisitionStage()
+
+    with patch(RUN_GIT) as mock_run:
+        mock_run.return_value = MagicMock()
+        result = asyncio.run(stage.execute(context))
+
+    assert not result.should_stop
+    commands = [call.args[0] for call in mock_run.call_args_list]
+    assert commands[0] == ["git", "init", "--quiet", context.local_context_path]
+    assert commands[2] == [
+        "git",
+        "-c",
+        "protocol.version=2",
+        "fetch",
+        "--depth",
+        "1",
+        "--filter=blob:none",
+        "origin",
+        "abc123",
+    ]
+    assert commands[3] == ["git", "checkout", "--quiet", "FETCH_HEAD"]
+    assert not any(command[:2] == ["git", "clone"] for command in commands)
+
+
+def test_workspace_acquisition_adds_worktree_from_repo_cache(tmp_path, monkeypatch):
+    payload = {
+        "object_kind": "note",
+        "project": {"id": 7, "git_http_url": "https://gitlab.com/test/repo.git"},
+    }
+    monkeypatch.setattr("src.pipelines.stages.context_builder.GITLAB_PAT", "secret")
+    context = PipelineContext(webhook_payload=payload)
+    context.code_snapshot = {"sha": "abc123", "branch": "feature"}
+    repo_cache = RepoCache(cache_dir=str(tmp_path))
+    stage = WorkspaceAcquisitionStage(
+        workspace_config=WorkspaceConfig(mode="repo_cache"), repo_cache=repo_cache
+    )
+
+    with patch("src.pipelines.repo_cache.run_git") as mock_run:
+        mock_run.return_value = MagicMock()
+        result = asyncio.run(stage.execute(context))
+
+    assert not result.should_stop
+    mirror = str(tmp_path / "7.git")
+    assert context.workspace_mirror_path == mirror
+    commands = [call.args[0] for call in mock_run.call_args_list]
+    assert commands == [
+        ["git", "clone", "--bare", "https://gitlab.com/test/repo.git", mirror],
+        [
+            "git",
+            "fetch",
+            "--prune",
+            "origin",
+            "abc123",
+            "+refs/heads/*:refs/heads/*",
+        ],
+        ["git", "worktree", "prune"],
+        [
+            "git",
+            "worktree",
+            "add",
+            "--detach",
+            context.local_context_path,
+            "FETCH_HEAD",
+        ],
+    ]
+    auth_env = mock_run.call_args_list[0].kwargs["env"]
+    assert auth_env["GIT_CONFIG_KEY_0"] == "http.extraHeader"
+    assert auth_env["GIT_CONFIG_VALUE_0"].startswith("Authorization: Basic ")
+    assert mock_run.call_args_list[2].kwargs == {"cwd": mirror}
+
+
+def test_repo_cache_refreshes_mirror_branches(tmp_path, monkeypatch):
+    for key in ("GIT_AUTHOR", "GIT_COMMITTER"):
+        monkeypatch.setenv(f"{key}_NAME", "Test")
+        monkeypatch.setenv(f"{key}_EMAIL", "test@example.com")
+
+    def git(*args, cwd):
+        return subprocess.run(
+            ["git", *args], cwd=cwd, check=True, capture_output=True, text=True
+        ).stdout.strip()
+
+    upstream = tmp_path / "upstream"
+    upstream.mkdir()
+    git("init", "--quiet", "--initial-branch", "main", cwd=upstream)
+    git("commit", "--quiet", "--allow-empty", "-m", "first", cwd=upstream)
+    remote_url = upstream.as_uri()
+    repo_cache = RepoCache(cache_dir=str(tmp_path / "cache"))
+
+    mirror = asyncio.run(
+        repo_cache.add_worktree(7, remote_url, str(tmp_path / "wt1"), "refs/heads/main")
+    )
+    git("commit", "--quiet", "--allow-empty", "-m", "second", cwd=upstream)
+    asyncio.run(
+        repo_cache.add_worktree(7, remote_url, str(tmp_path / "wt2"), "refs/heads/main")
+    )
+
+    head = git("rev-parse", "HEAD", cwd=upstream)
+    assert git("rev-parse", "refs/heads/main", cwd=mirror) == head
+    assert git("rev-parse", "HEAD", cwd=tmp_path / "wt2") == head
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from unittest.mock import patch
 from src.pipelines.stages.hook_resolver import HookResolverStage
@@ -19,10 +20,13 @@ def test_hook_resolver_detects_command():
 
     with patch("src.pipelines.stages.hook_resolver.post_gitlab_note") as mock_post:
         mock_post.return_value = {"id": 123}
-        result = stage.execute(context)
+        result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert context.command == "oc_review"
+    mock_post.assert_called_once()
+    assert mock_post.call_args.args[:3] == (1, "MergeRequest", 42)
+    assert mock_post.call_args.kwargs["project"] == {"id": 1}
 
 
 def test_hook_resolver_uses_preseeded_command(monkeypatch):
@@ -47,7 +51,7 @@ def test_hook_resolver_uses_preseeded_command(monkeypatch):
 
     with patch("src.pipelines.stages.hook_resolver.post_gitlab_note") as mock_post:
         mock_post.return_value = {"id": 123}
-        result = stage.execute(context)
+        result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert context.command == "oc_review"
@@ -65,7 +69,7 @@ def test_hook_resolver_ignores_non_note():
     context = PipelineContext(webhook_payload=payload)
     stage = HookResolverStage()
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert result.should_stop
 
@@ -82,6 +86,6 @@ def test_hook_resolver_ignores_no_command():
     context = PipelineContext(webhook_payload=payload)
     stage = HookResolverStage()
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert result.should_stop
@@ -1,29 +1,40 @@
+import asyncio
+import json
 from src.pipelines.base import PipelineContext
 from src.pipelines.stages.issue_context_fetcher import IssueContextFetcherStage
 
+FETCHER = "src.pipelines.stages.issue_context_fetcher"
+
 
 class FakeResponse:
     def __init__(self, url: str, text: str = "<html>not json</html>"):
         self.url = url
         self.text = text
+        self.content = text.encode()
+        self.headers = {}
 
     def raise_for_status(self):
         return None
 
-    def json(self):
-        raise ValueError("not json")
-
 
 class JsonResponse:
-    def __init__(self, payload):
-        self.payload = payload
+    def __init__(self, payload, headers=None):
         self.text = ""
+        self.content = json.dumps(payload).encode()
+        self.headers = headers or {}
 
     def raise_for_status(self):
         return None
 
-    def json(self):
-        return self.payload
+
+class FakeClient:
+    def __init__(self, handler):
+        self.handler = handler
+
+    async def get(self, url, params=None):
+        if params and params.get("page", 1) > 1:
+            return self.handler(f"{url}?page={params['page']}")
+        return self.handler(url)
 
 
 def test_issue_context_fetcher_uses_noteable_iid_and_skips_non_json(monkeypatch, tmp_path):
@@ -47,16 +58,18 @@ def test_issue_context_fetcher_uses_noteable_iid_and_skips_non_json(monkeypatch,
     stage = IssueContextFetcherStage()
     called_urls = []
 
-    monkeypatch.setenv("GITLAB_PAT", "test-token")
-    monkeypatch.setenv("GITLAB_URL", "https://gitlab.example.com/group/repo")
+    monkeypatch.setattr(f"{FETCHER}.GITLAB_PAT", "test-token")
 
-    def fake_get(url, headers, timeout):
+    def fake_get(url):
         called_urls.append(url)
         return FakeResponse(url)
 
-    monkeypatch.setattr("src.pipelines.stages.issue_context_fetcher.requests.get", fake_get)
+    monkeypatch.setattr(
+        f"{FETCHER}.get_gitlab_client",
+        lambda: FakeClient(fake_get),
+    )
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert called_urls == [
@@ -85,8 +98,7 @@ def test_issue_context_fetcher_writes_merge_request_context(monkeypatch, tmp_pat
     )
     stage = IssueContextFetcherStage()
 
-    monkeypatch.setenv("GITLAB_PAT", "test-token")
-    monkeypatch.setenv("GITLAB_URL", "https://gitlab.example.com/group/repo")
+    monkeypatch.setattr(f"{FETCHER}.GITLAB_PAT", "test-token")
 
     responses = {
         "https://gitlab.example.com/api/v4/projects/2679/merge_requests/77": JsonResponse(
@@ -121,12 +133,15 @@ def test_issue_context_fetcher_writes_merge_request_context(monkeypatch, tmp_pat
         ),
     }
 
-    def fake_get(url, headers, timeout):
+    def fake_get(url):
         return responses[url]
 
-    monkeypatch.setattr("src.pipelines.stages.issue_context_fetcher.requests.get", fake_get)
+    monkeypatch.setattr(
+        f"{FETCHER}.get_gitlab_client",
+        lambda: FakeClient(fake_get),
+    )
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     thread_context_path = context.metadata["thread_context_path"]
@@ -158,8 +173,7 @@ def test_issue_context_fetcher_can_pass_context_without_file(monkeypatch, tmp_pa
     )
     stage = IssueContextFetcherStage(write_to_workspace=False, pass_to_next=True)
 
-    monkeypatch.setenv("GITLAB_PAT", "test-token")
-    monkeypatch.setenv("GITLAB_URL", "https://gitlab.example.com/group/repo")
+    monkeypatch.setattr(f"{FETCHER}.GITLAB_PAT", "test-token")
 
     responses = {
         "https://gitlab.example.com/api/v4/projects/2679/issues/223": JsonResponse(
@@ -174,13 +188,90 @@ def test_issue_context_fetcher_can_pass_context_without_file(monkeypatch, tmp_pa
         ),
     }
 
-    def fake_get(url, headers, timeout):
+    def fake_get(url):
         return responses[url]
 
-    monkeypatch.setattr("src.pipelines.stages.issue_context_fetcher.requests.get", fake_get)
+    monkeypatch.setattr(
+        f"{FETCHER}.get_gitlab_client",
+        lambda: FakeClient(fake_get),
+    )
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert "thread_context_path" not in context.metadata
     assert "# GitLab Issue Context" in context.metadata["thread_context_content"]
+
+
+def test_issue_context_fetcher_collects_every_notes_page(monkeypatch):
+    stage = IssueContextFetcherStage()
+    notes_url = "https://gitlab.example.com/api/v4/projects/2679/issues/223/notes"
+
+    monkeypatch.setattr(f"{FETCHER}.GITLAB_PAT", "test-token")
+
+    responses = {
+        "https://gitlab.example.com/api/v4/projects/2679/issues/223": JsonResponse(
+            {"title": "Bug", "state": "opened", "description": "Something broke."}
+        ),
+        notes_url: JsonResponse(
+            [{"author": {"name": "Bob"}, "created_at": "2026-03-31T11:00:00Z", "body": "second"}],
+            headers={"X-Total-Pages": "3"},
+        ),
+        f"{notes_url}?page=2": JsonResponse(
+            [{"author": {"name": "Alice"}, "created_at": "2026-03-31T10:00:00Z", "body": "first"}]
+        ),
+        f"{notes_url}?page=3": JsonResponse(
+            [{"author": {"name": "Carol"}, "created_at": "2026-03-31T12:00:00Z", "body": "third"}]
+        ),
+    }
+
+    monkeypatch.setattr(
+        f"{FETCHER}.get_gitlab_client",
+        lambda: FakeClient(lambda url: responses[url]),
+    )
+
+    project = {
+        "web_url": "https://gitlab.example.com/group/repo",
+        "path_with_namespace": "group/repo",
+    }
+    content = asyncio.run(stage._build_issue_content(2679, 223, project=project))
+
+    assert content.index("first") < content.index("second") < content.index("third")
+
+
+def test_issue_context_fetcher_follows_next_page_without_total(monkeypatch):
+    stage = IssueContextFetcherStage()
+    notes_url = "https://gitlab.example.com/api/v4/projects/2679/issues/223/notes"
+
+    monkeypatch.setattr(f"{FETCHER}.GITLAB_PAT", "test-token")
+
+    responses = {
+        "https://gitlab.example.com/api/v4/projects/2679/issues/223": JsonResponse(
+            {"title": "Bug", "state": "opened", "description": "Something broke."}
+        ),
+        notes_url: JsonResponse(
+            [{"author": {"name": "Alice"}, "created_at": "2026-03-31T10:00:00Z", "body": "first"}],
+            headers={"X-Total-Pages": "many", "X-Next-Page": "2"},
+        ),
+        f"{notes_url}?page=2": JsonResponse(
+            [{"author": {"name": "Bob"}, "created_at": "2026-03-31T11:00:00Z", "body": "second"}],
+            headers={"X-Next-Page": "3"},
+        ),
+        f"{notes_url}?page=3": JsonResponse(
+            [{"author": {"name": "Carol"}, "created_at": "2026-03-31T12:00:00Z", "body": "third"}],
+            headers={"X-Next-Page": ""},
+        ),
+    }
+
+    monkeypatch.setattr(
+        f"{FETCHER}.get_gitlab_client",
+        lambda: FakeClient(lambda url: responses[url]),
+    )
+
+    project = {
+        "web_url": "https://gitlab.example.com/group/repo",
+        "path_with_namespace": "group/repo",
+    }
+    content = asyncio.run(stage._build_issue_content(2679, 223, project=project))
+
+    assert content.index("first") < content.index("second") < content.index("third")
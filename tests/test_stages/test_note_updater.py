@@ -0,0 +1,40 @@
+import asyncio
+from unittest.mock import patch
+
+from src.pipelines.base import AgentResult, PipelineContext
+from src.pipelines.stages.note_updater import NoteUpdaterStage
+
+
+def _context(**metadata):
+    payload = {
+        "project": {"id": 1},
+        "object_attributes": {"noteable_type": "MergeRequest", "noteable_iid": 42},
+    }
+    return PipelineContext(
+        webhook_payload=payload, metadata={"noteable_type": "MergeRequest", **metadata}
+    )
+
+
+def test_note_updater_posts_agent_results():
+    context = _context()
+    context.agent_result = AgentResult(content="Looks good.")
+
+    with patch("src.pipelines.stages.note_updater.post_gitlab_note") as mock_post:
+        result = asyncio.run(NoteUpdaterStage().execute(context))
+
+    assert not result.should_stop
+    assert mock_post.call_args.args == (
+        1,
+        "MergeRequest",
+        42,
+        "🤖 **OpenCode Results**\n\nLooks good.",
+    )
+
+
+def test_note_updater_posts_pipeline_error():
+    context = _context(pipeline_error="clone failed")
+
+    with patch("src.pipelines.stages.note_updater.post_gitlab_note") as mock_post:
+        asyncio.run(NoteUpdaterStage().execute(context))
+
+    assert mock_post.call_args.args[3] == "❌ **OpenCode Error**\n\nPipeline failed: clone failed"
@@ -1,7 +1,8 @@
-from unittest.mock import MagicMock
+import asyncio
 
 from src.pipelines.base import PipelineContext
 from src.pipelines.stages.opencode_integration import OpencodeIntegrationStage
+from tests.test_stages.fake_opencode import fake_subprocess_exec
 
 
 def test_opencode_integration_uses_question_and_issue_context(monkeypatch, tmp_path):
@@ -20,20 +21,16 @@ def test_opencode_integration_uses_question_and_issue_context(monkeypatch, tmp_p
     stage = OpencodeIntegrationStage()
     captured = {}
 
-    def fake_run(args, cwd, check, capture_output, text, env):
-        captured["args"] = args
-        captured["cwd"] = cwd
-        captured["env"] = env
-        return MagicMock(
-            returncode=0,
+    monkeypatch.setattr(
+        "src.pipelines.stages.opencode_integration.asyncio.create_subprocess_exec",
+        fake_subprocess_exec(
+            captured,
             stdout='{"type":"text","part":{"text":"Answer"}}\n'
             '{"type":"text","part":{"text":" ready"}}\n',
-            stderr="",
-        )
-
-    monkeypatch.setattr("src.pipelines.stages.opencode_integration.subprocess.run", fake_run)
+        ),
+    )
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert captured["cwd"] == str(tmp_path)
@@ -70,13 +67,12 @@ def test_opencode_integration_includes_prep_report_when_present(monkeypatch, tmp
     stage = OpencodeIntegrationStage()
     captured = {}
 
-    def fake_run(args, cwd, check, capture_output, text, env):
-        captured["prompt"] = args[-1]
-        return MagicMock(returncode=0, stdout="", stderr="")
-
-    monkeypatch.setattr("src.pipelines.stages.opencode_integration.subprocess.run", fake_run)
+    monkeypatch.setattr(
+        "src.pipelines.stages.opencode_integration.asyncio.create_subprocess_exec",
+        fake_subprocess_exec(captured),
+    )
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert captured["prompt"] == "\n\n".join(
@@ -103,13 +99,12 @@ def test_opencode_integration_defaults_when_question_missing(monkeypatch, tmp_pa
     stage = OpencodeIntegrationStage()
     captured = {}
 
-    def fake_run(args, cwd, check, capture_output, text, env):
-        captured["prompt"] = args[-1]
-        return MagicMock(returncode=0, stdout="", stderr="")
-
-    monkeypatch.setattr("src.pipelines.stages.opencode_integration.subprocess.run", fake_run)
+    monkeypatch.setattr(
+        "src.pipelines.stages.opencode_integration.asyncio.create_subprocess_exec",
+        fake_subprocess_exec(captured),
+    )
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert captured["prompt"] == "\n\n".join(
@@ -141,13 +136,12 @@ def test_opencode_integration_uses_env_model_and_agent(monkeypatch, tmp_path):
     stage = OpencodeIntegrationStage()
     captured = {}
 
-    def fake_run(args, cwd, check, capture_output, text, env):
-        captured["args"] = args
-        return MagicMock(returncode=0, stdout="", stderr="")
-
-    monkeypatch.setattr("src.pipelines.stages.opencode_integration.subprocess.run", fake_run)
+    monkeypatch.setattr(
+        "src.pipelines.stages.opencode_integration.asyncio.create_subprocess_exec",
+        fake_subprocess_exec(captured),
+    )
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert captured["args"][0] == "opencode-safe"
@@ -169,14 +163,12 @@ def test_opencode_integration_uses_review_prompt_and_agent(monkeypatch, tmp_path
     stage = OpencodeIntegrationStage(agent="gitlab-review")
     captured = {}
 
-    def fake_run(args, cwd, check, capture_output, text, env):
-        captured["args"] = args
-        captured["env"] = env
-        return MagicMock(returncode=0, stdout="", stderr="")
-
-    monkeypatch.setattr("src.pipelines.stages.opencode_integration.subprocess.run", fake_run)
+    monkeypatch.setattr(
+        "src.pipelines.stages.opencode_integration.asyncio.create_subprocess_exec",
+        fake_subprocess_exec(captured),
+    )
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert captured["args"][7] == "gitlab-review"
@@ -209,13 +201,12 @@ def test_opencode_integration_strips_mention_for_review_request(monkeypatch, tmp
     stage = OpencodeIntegrationStage(agent="gitlab-review")
     captured = {}
 
-    def fake_run(args, cwd, check, capture_output, text, env):
-        captured["prompt"] = args[-1]
-        return MagicMock(returncode=0, stdout="", stderr="")
-
-    monkeypatch.setattr("src.pipelines.stages.opencode_integration.subprocess.run", fake_run)
+    monkeypatch.setattr(
+        "src.pipelines.stages.opencode_integration.asyncio.create_subprocess_exec",
+        fake_subprocess_exec(captured),
+    )
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert captured["prompt"] == "\n\n".join(
@@ -251,13 +242,12 @@ def test_opencode_integration_uses_thread_context_and_state_for_review(monkeypat
     stage = OpencodeIntegrationStage(agent="gitlab-review")
     captured = {}
 
-    def fake_run(args, cwd, check, capture_output, text, env):
-        captured["prompt"] = args[-1]
-        return MagicMock(returncode=0, stdout="", stderr="")
-
-    monkeypatch.setattr("src.pipelines.stages.opencode_integration.subprocess.run", fake_run)
+    monkeypatch.setattr(
+        "src.pipelines.stages.opencode_integration.asyncio.create_subprocess_exec",
+        fake_subprocess_exec(captured),
+    )
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert captured["prompt"] == "\n\n".join(
@@ -290,10 +280,63 @@ def test_opencode_integration_rejects_historical_review_without_thread_context(t
     )
     stage = OpencodeIntegrationStage(agent="gitlab-review")
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert result.should_stop
     assert (
         "Cannot review this merge request reliably because it is not open"
         in str(result.error)
     )
+
+
+def test_parse_text_event_skips_non_text_events():
+    parse = OpencodeIntegrationStage._parse_text_event
+
+    assert parse(b'{"type":"text","part":{"text":"Answer"}}\n') == "Answer"
+    assert parse(b'{"type": "text", "part": {"text": "spaced"}}') == "spaced"
+    assert parse(b'{"type":"tool_use","part":{"tool":"bash"}}') is None
+    assert parse(b'{"type":"step_start","part":{"text":"not a text event"}}') is None
+    assert parse(b'"text" but not json') is None
+    assert parse(b'"text"') is None
+    assert parse(b"\n") is None
+
+
+def test_extract_question_removes_only_the_invoking_trigger():
+    stage = OpencodeIntegrationStage()
+
+    def question(note_body, trigger):
+        context = PipelineContext(
+            webhook_payload={},
+            metadata={"note_body": note_body, "trigger_pattern": trigger},
+        )
+        return stage._extract_question(context)
+
+    assert question("  /oc_ask what does /oc_ask do?", "/oc_ask") == "what does /oc_ask do?"
+    assert question("hey @nid-bugbard check this", "@nid-bugbard") == "hey  check this"
+    assert question("/oc_ask", "/oc_ask") == "No additional question provided."
+
+
+def test_run_opencode_waits_for_a_free_slot(monkeypatch):
+    stage = OpencodeIntegrationStage()
+    active = []
+    peak = []
+
+    async def fake_process(repo_dir, prompt, events_path):
+        active.append(prompt)
+        peak.append(len(active))
+        await asyncio.sleep(0)
+        active.remove(prompt)
+
+    async def run_three():
+        monkeypatch.setattr(
+            "src.pipelines.stages.opencode_integration._opencode_slots",
+            asyncio.Semaphore(1),
+        )
+        monkeypatch.setattr(stage, "_run_opencode_process", fake_process)
+        await asyncio.gather(
+            *(stage._run_opencode("/tmp", f"prompt {i}", "events.jsonl") for i in range(3))
+        )
+
+    asyncio.run(run_three())
+
+    assert peak == [1, 1, 1]
@@ -1,8 +1,9 @@
+import asyncio
 from pathlib import Path
-from unittest.mock import MagicMock
 
 from src.pipelines.base import PipelineContext
 from src.pipelines.stages.opencode_integration import OpencodePreparationStage
+from tests.test_stages.fake_opencode import fake_subprocess_exec
 
 
 def test_opencode_preparation_writes_events_and_report(monkeypatch, tmp_path):
@@ -23,21 +24,15 @@ def test_opencode_preparation_writes_events_and_report(monkeypatch, tmp_path):
     stage = OpencodePreparationStage()
     captured = {}
 
-    def fake_run(args, cwd, check, capture_output, text, env):
-        captured["args"] = args
-        captured["cwd"] = cwd
-        captured["env"] = env
-        return MagicMock(
-            returncode=0,
-            stdout='{"type":"text","part":{"text":"## Installed or Prepared\\n- uv sync"}}\n',
-            stderr="",
-        )
-
     monkeypatch.setattr(
-        "src.pipelines.stages.opencode_integration.subprocess.run", fake_run
+        "src.pipelines.stages.opencode_integration.asyncio.create_subprocess_exec",
+        fake_subprocess_exec(
+            captured,
+            stdout='{"type":"text","part":{"text":"## Installed or Prepared\\n- uv sync"}}\n',
+        ),
     )
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert captured["cwd"] == str(tmp_path)
@@ -64,15 +59,11 @@ def test_opencode_preparation_records_failure_without_stopping(monkeypatch, tmp_
     stage = OpencodePreparationStage()
 
     monkeypatch.setattr(
-        "src.pipelines.stages.opencode_integration.subprocess.run",
-        lambda args, cwd, check, capture_output, text, env: MagicMock(
-            returncode=1,
-            stdout="",
-            stderr="toolchain missing",
-        ),
+        "src.pipelines.stages.opencode_integration.asyncio.create_subprocess_exec",
+        fake_subprocess_exec(returncode=1, stderr="toolchain missing"),
     )
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     report_path = Path(context.metadata["prep_report_path"])
@@ -1,3 +1,4 @@
+import asyncio
 from pathlib import Path
 from unittest.mock import MagicMock
 
@@ -9,7 +10,7 @@ def test_repo_hook_stage_skips_when_disabled(tmp_path):
     context = PipelineContext(webhook_payload={}, local_context_path=str(tmp_path))
     stage = RepoHookPreparationStage(enabled=False)
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert "prep_report_path" not in context.metadata
@@ -19,7 +20,7 @@ def test_repo_hook_stage_skips_when_script_missing(tmp_path):
     context = PipelineContext(webhook_payload={}, local_context_path=str(tmp_path))
     stage = RepoHookPreparationStage(enabled=True)
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert "prep_report_path" not in context.metadata
@@ -39,7 +40,7 @@ def test_repo_hook_stage_runs_script_and_records_output(monkeypatch, tmp_path):
         "src.pipelines.stages.repo_hook_preparation.subprocess.run", fake_run
     )
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     report_path = Path(context.metadata["prep_report_path"])
@@ -61,7 +62,7 @@ def test_repo_hook_stage_records_failure_without_stopping(monkeypatch, tmp_path)
         ),
     )
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     report_path = Path(context.metadata["prep_report_path"])
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 from src.pipelines.stages.snapshot_resolver import SnapshotResolverStage
 from src.pipelines.base import PipelineContext
@@ -18,7 +19,7 @@ def test_snapshot_resolver_mr():
     context.metadata["noteable_type"] = "MergeRequest"
     stage = SnapshotResolverStage()
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert context.code_snapshot["sha"] == "abc123"
@@ -41,7 +42,7 @@ def test_snapshot_resolver_mr_falls_back_to_source_branch_when_sha_missing():
     context.metadata["noteable_type"] = "MergeRequest"
     stage = SnapshotResolverStage()
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert context.code_snapshot["sha"] is None
@@ -66,7 +67,7 @@ def test_snapshot_resolver_mr_uses_additional_sha_candidates():
     context.metadata["noteable_type"] = "MergeRequest"
     stage = SnapshotResolverStage()
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert context.code_snapshot["sha"] == "deadbeef"
@@ -85,8 +86,17 @@ def test_snapshot_resolver_issue():
     context.metadata["noteable_type"] = "Issue"
     stage = SnapshotResolverStage()
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert context.code_snapshot["branch"] == "trunk"
     assert context.code_snapshot["sha"] is None
+
+
+def test_resolve_merge_request_sha_falls_back_without_diff_refs():
+    resolve = SnapshotResolverStage._resolve_merge_request_sha
+
+    assert resolve({"diff_refs": {"head_sha": "abc"}, "sha": "def"}) == "abc"
+    assert resolve({"diff_refs": None, "sha": "def"}) == "def"
+    assert resolve({"diff_refs": {}, "last_commit": {"id": "fed"}}) == "fed"
+    assert resolve({}) is None
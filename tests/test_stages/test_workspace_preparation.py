@@ -1,3 +1,4 @@
+import asyncio
 from src.pipelines.base import PipelineContext, PreparationConfig
 from src.pipelines.stages.workspace_preparation import WorkspacePreparationStage
 
@@ -6,7 +7,7 @@ def test_workspace_preparation_stage_is_noop_when_no_routes():
     context = PipelineContext(webhook_payload={})
     stage = WorkspacePreparationStage()
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
 
@@ -18,11 +19,11 @@ def test_workspace_preparation_stage_runs_routes_in_order(monkeypatch):
     )
     calls: list[str] = []
 
-    def fake_repo_execute(self, context_arg):
+    async def fake_repo_execute(self, context_arg):
         calls.append("repo_hook")
         return type("Result", (), {"context": context_arg, "should_stop": False})()
 
-    def fake_opencode_execute(self, context_arg):
+    async def fake_opencode_execute(self, context_arg):
         calls.append("opencode")
         return type("Result", (), {"context": context_arg, "should_stop": False})()
 
@@ -35,7 +36,7 @@ def test_workspace_preparation_stage_runs_routes_in_order(monkeypatch):
         fake_opencode_execute,
     )
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert not result.should_stop
     assert calls == ["repo_hook", "opencode"]
@@ -47,7 +48,7 @@ def test_workspace_preparation_stage_rejects_unknown_route():
         preparation_config=PreparationConfig(routes=("unknown",))
     )
 
-    result = stage.execute(context)
+    result = asyncio.run(stage.execute(context))
 
     assert result.should_stop
     assert "Unsupported workspace preparation route: unknown" in str(result.error)
@@ -0,0 +1,28 @@
+from src.webhook_events import decode_webhook_event, decode_webhook_payload
+
+
+def test_decode_webhook_event_reads_routing_fields_and_skips_the_rest():
+    body = (
+        b'{"object_kind": "note", "user": {"username": "alice", "email": "a@x"},'
+        b' "project": {"id": 1, "web_url": "https://gitlab.example.com/g/r"},'
+        b' "object_attributes": {"id": 9, "note": "/oc_review", "noteable_type": "MergeRequest",'
+        b' "position": {"new_line": 3}}, "merge_request": {"iid": 42}}'
+    )
+
+    event = decode_webhook_event(body)
+
+    assert event.object_kind == "note"
+    assert event.user.username == "alice"
+    assert event.project.id == 1
+    assert event.object_attributes.note == "/oc_review"
+    assert event.object_attributes.noteable_type == "MergeRequest"
+    assert decode_webhook_payload(body)["merge_request"] == {"iid": 42}
+
+
+def test_decode_webhook_event_defaults_missing_sections():
+    event = decode_webhook_event(b'{"object_kind": "push"}')
+
+    assert event.object_kind == "push"
+    assert event.user.username is None
+    assert event.project.id is None
+    assert event.object_attributes.note is None
@@ -48,7 +48,7 @@ export interface PipelineDocument {
     maxConcurrentRuns: number;
   };
   workspace: {
-    mode: "fresh_clone";
+    mode: "fresh_clone" | "repo_cache";
     cleanupAfterRun: boolean;
     checkoutStrategy: "source_branch" | "explicit_ref";
   };